@@ -0,0 +1,285 @@
+import os
+import json
+import asyncio
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from aiohttp import web
+import backend_api
+from tile_server import WATER_SOURCES, YIELD_GOALS, add_tile_routes, cors_middleware
+
+# ==========================================
+# HTTP API
+# ==========================================
+# backend_api for other systems (farm planning tools, nightly jobs), as an
+# async JSON service next to the Streamlit app:
+#
+#   GET  /plants                       plant names + table version
+#   GET  /plants/{name}                one plant's rules
+#   GET  /analyze?plant=&lat=&lon=     analyze_suitability
+#   GET  /scan?plant=&mode=            scan_continent_heatmap, one row per country
+#   POST /batch                        many (lat, lon, plant) triples, NDJSON out
+#   GET  /tiles/{plant}/{z}/{x}/{y}.png  suitability tiles (tile_server.py)
+#   GET  /health                       plant version + cache stats
+#
+# Every endpoint takes optional water= / goal= (same values as the app).
+# backend_api is synchronous, so calls run on a thread pool the size of the
+# DB connection pool; the event loop only parses and streams.
+#
+# /batch reads its body as NDJSON ({"lat": .., "lon": .., "plant": ..} per
+# line) or as one JSON array, scores it in chunks of API_BATCH_CHUNK with
+# backend_api.analyze_batch and streams one result line per input line, in
+# order. Each chunk is scored while the next one is being read:
+#
+#   curl -X POST --data-binary @points.ndjson localhost:8000/batch?water=Irrigated
+#
+#   python api_server.py --port 8000
+
+API_WORKERS = int(os.getenv("API_WORKERS", str(backend_api.DB_POOL_MAX)))
+BATCH_CHUNK = int(os.getenv("API_BATCH_CHUNK", "1000"))
+BATCH_MAX_ITEMS = int(os.getenv("API_BATCH_MAX_ITEMS", "100000"))
+
+
+# ==========================================
+# 1. HELPERS
+# ==========================================
+def _default(value):
+    # numpy scalars from the scoring code
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _dumps(data):
+    return json.dumps(data, default=_default)
+
+
+def _json(data, status=200):
+    return web.json_response(data, status=status, dumps=_dumps)
+
+
+async def _run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+def _settings(query):
+    water = query.get("water", "Rainfed Only")
+    goal = query.get("goal", "Survival")
+    if water not in WATER_SOURCES or goal not in YIELD_GOALS:
+        raise web.HTTPBadRequest(text="Unknown water source or yield goal")
+    return water, goal
+
+
+def _coordinate(value, name, limit):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not -limit <= number <= limit:
+        raise ValueError(f"{name} out of range")
+    return number
+
+
+def _point(query):
+    try:
+        return _coordinate(query.get("lat"), "lat", 90), _coordinate(query.get("lon"), "lon", 180)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+
+
+async def _plant(name):
+    if not name:
+        raise web.HTTPBadRequest(text="Missing plant")
+    plant = await _run(backend_api.get_plant_rules, name)
+    if not plant:
+        if await _run(backend_api.get_plant_table) is None:
+            raise web.HTTPServiceUnavailable(text="DB Error")
+        raise web.HTTPNotFound(text=f"Unknown plant: {name}")
+    return plant
+
+
+# ==========================================
+# 2. ENDPOINTS
+# ==========================================
+async def health_handler(request):
+    table = await _run(backend_api.get_plant_table)
+    return _json(
+        {
+            "status": "ok" if table is not None else "degraded",
+            "plant_version": table["version"] if table else None,
+            "climate_backend": backend_api.CLIMATE_BACKEND,
+            "caches": backend_api.get_cache_stats(),
+        }
+    )
+
+
+async def plants_handler(request):
+    table = await _run(backend_api.get_plant_table)
+    if table is None:
+        raise web.HTTPServiceUnavailable(text="DB Error")
+    return _json({"version": table["version"], "plants": list(table["names"])})
+
+
+async def plant_handler(request):
+    return _json(await _plant(request.match_info["name"]))
+
+
+async def analyze_handler(request):
+    water, goal = _settings(request.query)
+    lat, lon = _point(request.query)
+    plant = await _plant(request.query.get("plant"))
+    result = await _run(backend_api.analyze_suitability, plant["name"], lat, lon, water, goal)
+    status = 503 if result.get("error") in ("DB Error", "Climate Data Error") else 200
+    return _json(result, status)
+
+
+async def scan_handler(request):
+    water, goal = _settings(request.query)
+    mode = request.query.get("mode", "Country Mean")
+    if mode not in backend_api.SCAN_MODES:
+        raise web.HTTPBadRequest(text=f"mode must be one of {backend_api.SCAN_MODES}")
+    plant = await _plant(request.query.get("plant"))
+    scan_df = await _run(
+        backend_api.scan_continent_heatmap, plant["name"], 0, 0,
+        water_source=water, yield_goal=goal, scan_mode=mode,
+    )
+    if scan_df.empty:
+        raise web.HTTPServiceUnavailable(text="Climate data unavailable")
+    return _json({"plant": plant["name"], "mode": mode, "countries": scan_df.to_dict("records")})
+
+
+# ==========================================
+# 3. BATCH
+# ==========================================
+def _triple(obj):
+    """(lat, lon, plant) from one request item; ValueError if malformed."""
+    if not isinstance(obj, dict):
+        raise ValueError("expected an object with lat, lon and plant")
+    plant = obj.get("plant")
+    if not isinstance(plant, str) or not plant:
+        raise ValueError("plant must be a name")
+    return _coordinate(obj.get("lat"), "lat", 90), _coordinate(obj.get("lon"), "lon", 180), plant
+
+
+async def _ndjson_items(content):
+    async for line in content:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+async def _list_items(items):
+    for item in items:
+        yield item
+
+
+async def _score_chunk(chunk, water, goal):
+    """NDJSON lines for [(position, item)], in order; malformed items get an error line."""
+    lines, triples, scored = [], [], []
+    for i, item in chunk:
+        line = {"i": i}
+        if isinstance(item, dict):
+            line.update({k: item.get(k) for k in ("lat", "lon", "plant")})
+        try:
+            triples.append(_triple(item))
+            scored.append(line)
+        except ValueError as e:
+            line["error"] = str(e)
+        lines.append(line)
+
+    for line, result in zip(scored, await _run(backend_api.analyze_batch, triples, water, goal)):
+        line.update(result)
+    return "".join(_dumps(line) + "\n" for line in lines).encode()
+
+
+async def batch_handler(request):
+    water, goal = _settings(request.query)
+    if request.content_type == "application/json":
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Body is not valid JSON")
+        if not isinstance(body, list):
+            raise web.HTTPBadRequest(text="Expected a JSON array of {lat, lon, plant}")
+        items = _list_items(body)
+    else:
+        items = _ndjson_items(request.content)
+
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+
+    # One chunk is scored (on the thread pool) while the next one is read;
+    # results are written in input order
+    chunk, count, scoring, limited = [], 0, None, False
+    try:
+        async for item in items:
+            if count >= BATCH_MAX_ITEMS:
+                limited = True
+                break
+            chunk.append((count, item))
+            count += 1
+            if len(chunk) >= BATCH_CHUNK:
+                if scoring is not None:
+                    await response.write(await scoring)
+                scoring = asyncio.ensure_future(_score_chunk(chunk, water, goal))
+                chunk = []
+
+        if scoring is not None:
+            await response.write(await scoring)
+            scoring = None
+        if chunk:
+            await response.write(await _score_chunk(chunk, water, goal))
+        if limited:
+            # Keep everything scored so far, tell the client where it stopped
+            limit = {"error": f"Batch limit of {BATCH_MAX_ITEMS} items reached"}
+            await response.write(_dumps(limit).encode() + b"\n")
+    finally:
+        if scoring is not None:
+            scoring.cancel()
+
+    await response.write_eof()
+    return response
+
+
+# ==========================================
+# 4. APP
+# ==========================================
+async def _on_startup(app):
+    # One worker per pooled connection: more threads would only queue on the pool
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=API_WORKERS))
+
+
+async def _on_cleanup(app):
+    await _run(backend_api.close_db_pool)
+
+
+def make_app():
+    app = web.Application(middlewares=[cors_middleware], client_max_size=64 * 1024**2)
+    app.router.add_get("/health", health_handler)
+    app.router.add_get("/plants", plants_handler)
+    app.router.add_get("/plants/{name}", plant_handler)
+    app.router.add_get("/analyze", analyze_handler)
+    app.router.add_get("/scan", scan_handler)
+    app.router.add_post("/batch", batch_handler)
+    add_tile_routes(app)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve backend_api over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        print(f"API workers: {API_WORKERS}, batch chunk: {BATCH_CHUNK}")
+        web.run_app(make_app(), host=args.host, port=args.port)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
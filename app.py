@@ -1,18 +1,195 @@
+import os
+import copy
+import time
+from contextlib import closing
+from urllib.parse import quote, urlencode
 import streamlit as st
 import pandas as pd
 import folium
 from streamlit_folium import st_folium
 import streamlit.components.v1 as components
 import backend_api
+import country_shapes
+from countries import WORLD_LOCATIONS
 from charts import (
     create_radar_chart,
     create_diverging_bar_chart,
     create_top_countries_chart,
     create_circular_gauge,
+    create_top_plants_chart,
 )
 
 st.set_page_config(page_title="GeoPlant", layout="wide", page_icon="🌱")
 
+# Optional pixel-level suitability layer from tile_server.py (URL as seen by the browser)
+TILE_SERVER_URL = os.getenv("TILE_SERVER_URL", "").rstrip("/")
+
+# ---------------------------------------------------------
+# CACHED RESOURCES & DATA
+# ---------------------------------------------------------
+# Every widget interaction and map click reruns this script. Anything that
+# only depends on its inputs is cached here, so a rerun with unchanged inputs
+# does no backend or map rendering work. Resources are shared by all sessions.
+CACHE_TTL_SECONDS = 3600
+GLOBAL_MAP_ZOOM = 2
+# While a scan streams in, redraw the map and top 10 at most this often
+SCAN_REDRAW_SECONDS = 0.75
+SCAN_CACHE_ENTRIES = 256
+
+
+@st.cache_resource
+def load_country_shapes():
+    """Bundled country outlines (TopoJSON), parsed once per server process."""
+    return country_shapes.load_shapes()
+
+
+@st.cache_data(ttl=backend_api.PLANT_VERSION_CHECK_SECONDS, show_spinner=False)
+def cached_plant_list():
+    plants = backend_api.get_plant_list()
+    if not plants:
+        # Raising keeps an empty list (DB down) out of the cache
+        raise RuntimeError("No plants available")
+    return plants
+
+
+def build_global_map(scan_df, plant_name, water_source, yield_goal):
+    """The global choropleth of `scan_df` (complete or partial) as HTML."""
+    m_global = folium.Map(
+        location=[20, 0],
+        zoom_start=GLOBAL_MAP_ZOOM,
+        tiles="https://{s}.basemaps.cartocdn.com/light_nolabels/{z}/{x}/{y}{r}.png",
+        attr="CartoDB",
+    )
+
+    # --- 1. INJECT TITLE (Floating Inside Card) ---
+    title_html = """
+    <div style="
+        position: fixed; top: 15px; left: 50%; transform: translateX(-50%);
+        z-index: 1000; background-color: white; padding: 5px 15px;
+        border: 2px solid black; border-radius: 10px;
+        font-family: 'Montserrat', sans-serif; font-weight: 900;
+        font-size: 16px; color: #333; box-shadow: 3px 3px 0px black;">
+        GLOBAL MAP
+    </div>
+    """
+    m_global.get_root().html.add_child(folium.Element(title_html))
+
+    # --- 2. INJECT LEGEND (Floating Bottom Left) ---
+    legend_html = """
+    <div style="
+        position: fixed; bottom: 20px; left: 20px; z-index: 1000;
+        background-color: white; padding: 10px; border: 2px solid black;
+        border-radius: 10px; font-family: 'Poppins', sans-serif;
+        box-shadow: 3px 3px 0px black; font-size: 12px;">
+        <div style="margin-bottom: 5px; font-weight: bold; text-align:center;">SUITABILITY (%)</div>
+        <div style="display:flex; align-items:center; margin-bottom:3px;">
+            <span style="background:#BDD409; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> High (>75)
+        </div>
+        <div style="display:flex; align-items:center; margin-bottom:3px;">
+            <span style="background:#1F89D8; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> Medium (75-45)
+        </div>
+        <div style="display:flex; align-items:center;">
+            <span style="background:#E6A8D7; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> Low (<45)
+        </div>
+    </div>
+    """
+    m_global.get_root().html.add_child(folium.Element(legend_html))
+
+    # --- CUSTOM COLOR LOGIC ---
+    score_dict = scan_df.set_index("country")["score"].to_dict()
+
+    def style_function(feature):
+        country_name = feature["properties"]["name"]
+        score = score_dict.get(country_name, None)
+        fill_color = "#f0f0f0"
+
+        if score is not None:
+            if score >= 75:
+                fill_color = "#BDD409"  # C_LIME
+            elif score >= 45:
+                fill_color = "#1F89D8"  # C_MED_BLUE
+            else:
+                fill_color = "#E6A8D7"  # C_PINK
+
+        return {
+            "fillColor": fill_color,
+            "color": "black",
+            "weight": 1,
+            "fillOpacity": 0.8,
+        }
+
+    folium.TopoJson(
+        # folium writes the styles into the geometries: keep the shared copy pristine
+        copy.deepcopy(load_country_shapes()),
+        f"objects.{country_shapes.TOPOJSON_OBJECT}",
+        name="Suitability",
+        style_function=style_function,
+        tooltip=folium.GeoJsonTooltip(
+            fields=["name"],
+            aliases=["Country:"],
+            style="font-family: Poppins; font-size: 14px;",
+        ),
+    ).add_to(m_global)
+
+    # --- SUB-NATIONAL DETAIL (tile server) ---
+    if TILE_SERVER_URL:
+        query = urlencode({"water": water_source, "goal": yield_goal})
+        folium.TileLayer(
+            tiles=f"{TILE_SERVER_URL}/tiles/{quote(plant_name)}/{{z}}/{{x}}/{{y}}.png?{query}",
+            attr="GeoPlant",
+            name="Suitability (detail)",
+            overlay=True,
+            opacity=0.75,
+        ).add_to(m_global)
+        folium.LayerControl(collapsed=True).add_to(m_global)
+
+    map_html = m_global.get_root().render()
+
+    map_html = map_html.replace(
+        "</head>",
+        "<style>html, body {width: 100%; height: 100%; margin: 0; padding: 0;}</style></head>",
+    )
+    return map_html
+
+
+@st.cache_resource
+def finished_scans():
+    """Completed country scans of ALL sessions: {scan key: (finished_at, scan_df)}."""
+    return backend_api.LRUCache(SCAN_CACHE_ENTRIES)
+
+
+def _plant_version():
+    table = backend_api.get_plant_table()
+    return table["version"] if table else None
+
+
+def cached_scan(plant_name, water_source, yield_goal, scan_mode):
+    """
+    A finished scan for these inputs from any session, or None (scan it).
+    Keyed on the plant data version too, so an upload invalidates old scans.
+    """
+    key = (plant_name, water_source, yield_goal, scan_mode, _plant_version())
+    found, entry = finished_scans().get(key)
+    if not found or time.monotonic() - entry[0] > CACHE_TTL_SECONDS:
+        return None
+    return entry[1]
+
+
+def store_scan(scan_key, scan_df, plant_version):
+    finished_scans().put(scan_key + (plant_version,), (time.monotonic(), scan_df))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=SCAN_CACHE_ENTRIES, show_spinner=False)
+def cached_top_countries(scan_df, plant_name):
+    return backend_api.get_top_countries(plant_name, scan_df)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=32, show_spinner=False)
+def render_global_map(scan_df, plant_name, water_source, yield_goal):
+    """build_global_map for a finished scan; reruns reuse the HTML."""
+    return build_global_map(scan_df, plant_name, water_source, yield_goal)
+
+
 # ---------------------------------------------------------
 # CSS & STYLING
 # ---------------------------------------------------------
@@ -113,6 +290,16 @@ if "analysis_result" not in st.session_state:
     st.session_state.analysis_result = None
 if "regional_scan" not in st.session_state:
     st.session_state.regional_scan = pd.DataFrame()
+if "plant_ranking" not in st.session_state:
+    st.session_state.plant_ranking = pd.DataFrame()
+if "scan_key" not in st.session_state:
+    st.session_state.scan_key = None
+if "scan_running" not in st.session_state:
+    st.session_state.scan_running = False
+if "scan_cancelled" not in st.session_state:
+    st.session_state.scan_cancelled = False
+if "scan_error" not in st.session_state:
+    st.session_state.scan_error = None
 
 # ---------------------------------------------------------
 # HEADER
@@ -136,7 +323,7 @@ with st.container():
     with c1:
         st.markdown("### 1. SELECT PLANT")
         try:
-            plant_list = backend_api.get_plant_list()
+            plant_list = cached_plant_list()
         except:
             plant_list = []
         if not plant_list:
@@ -148,6 +335,7 @@ with st.container():
         selected_goal = st.selectbox(
             "Yield Target:", ["Survival", "Max Yield (Strict)"]
         )
+        selected_scan = st.selectbox("Country Score:", backend_api.SCAN_MODES)
 
     with c2:
         st.markdown("### 2. PICK LOCATION")
@@ -170,7 +358,7 @@ with st.container():
 
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("RUN GLOBAL ANALYSIS", type="primary", use_container_width=True):
-        with st.spinner("Scanning 190+ Countries..."):
+        with st.spinner("Analyzing location..."):
             res = backend_api.analyze_suitability(
                 selected_plant,
                 st.session_state.lat,
@@ -181,15 +369,113 @@ with st.container():
             st.session_state.analysis_result = res
 
             if "error" not in res:
-                st.session_state.regional_scan = backend_api.scan_continent_heatmap(
+                st.session_state.scan_key = (
                     selected_plant,
-                    0,
-                    0,
+                    selected_water,
+                    selected_goal,
+                    selected_scan,
+                )
+                # Scanned before (by any session): show it at once. Otherwise
+                # the scan streams in below, see stream_global_scan
+                cached = cached_scan(*st.session_state.scan_key)
+                st.session_state.regional_scan = cached if cached is not None else pd.DataFrame()
+                st.session_state.scan_running = cached is None
+                st.session_state.scan_cancelled = False
+                st.session_state.scan_error = None
+                ranking = backend_api.rank_plants_for_location(
+                    st.session_state.lat,
+                    st.session_state.lon,
                     water_source=selected_water,
                     yield_goal=selected_goal,
                 )
+                st.session_state.plant_ranking = ranking.get(
+                    "ranking", pd.DataFrame()
+                )
             st.rerun()
 
+
+# ---------------------------------------------------------
+# GLOBAL SCAN (streamed)
+# ---------------------------------------------------------
+def draw_global_results(map_area, top_area, scan_df, location_name, score, final=True):
+    plant_name, water_source, yield_goal, _ = st.session_state.scan_key
+    if final:
+        map_html = render_global_map(scan_df, plant_name, water_source, yield_goal)
+        top = cached_top_countries(scan_df, plant_name)
+    else:
+        map_html = build_global_map(scan_df, plant_name, water_source, yield_goal)
+        top = backend_api.get_top_countries(plant_name, scan_df)
+    with map_area:
+        components.html(map_html, height=525)
+    with top_area:
+        st.plotly_chart(
+            create_top_countries_chart(
+                top,
+                current_name=location_name,
+                current_score=score,
+                height=500,
+            ),
+            use_container_width=True,
+            # One chart per redraw: unique keys, or Streamlit sees duplicates
+            key=f"top_countries_{len(scan_df)}_{final}",
+        )
+
+
+def stream_global_scan(m1, m2, location_name, score):
+    """
+    Runs the country scan chunk by chunk, redrawing the map and the top 10
+    as results arrive (at most every SCAN_REDRAW_SECONDS). Cancelling keeps
+    what has arrived so far; only complete scans go into the shared cache.
+    """
+    plant_name, water_source, yield_goal, scan_mode = st.session_state.scan_key
+    if m2.button("CANCEL SCAN", use_container_width=True):
+        # The click reran the script, which interrupted the running stream
+        st.session_state.scan_running = False
+        st.session_state.scan_cancelled = True
+        st.rerun()
+
+    plant_version = _plant_version()
+    progress = m2.progress(0.0, text="Scanning countries...")
+    map_area, top_area = m1.empty(), m2.empty()
+    scan_df = pd.DataFrame()
+    drawn_at = 0.0
+    stream = backend_api.iter_scan_continent_heatmap(
+        plant_name,
+        st.session_state.lat,
+        st.session_state.lon,
+        water_source=water_source,
+        yield_goal=yield_goal,
+        scan_mode=scan_mode,
+    )
+    # closing() stops the backend lookups if the run is interrupted
+    with closing(stream):
+        try:
+            for chunk in stream:
+                scan_df = pd.concat([scan_df, chunk], ignore_index=True)
+                st.session_state.regional_scan = scan_df
+                progress.progress(
+                    min(1.0, len(scan_df) / len(WORLD_LOCATIONS)),
+                    text=f"Scanned {len(scan_df)} countries...",
+                )
+                if time.monotonic() - drawn_at >= SCAN_REDRAW_SECONDS:
+                    draw_global_results(
+                        map_area.container(), top_area.container(), scan_df, location_name, score, final=False
+                    )
+                    drawn_at = time.monotonic()
+        except RuntimeError as e:
+            # Backend failure part-way: keep what arrived, say why it stopped
+            st.session_state.scan_error = str(e)
+
+    if st.session_state.scan_error is None:
+        if scan_df.empty:
+            st.session_state.scan_error = "No country could be scored"
+        elif plant_version is not None and plant_version == _plant_version():
+            # Not stored if the plant data changed while the scan ran
+            store_scan(st.session_state.scan_key, scan_df, plant_version)
+    st.session_state.scan_running = False
+    st.rerun()
+
+
 # ---------------------------------------------------------
 # RESULTS
 # ---------------------------------------------------------
@@ -205,6 +491,10 @@ if st.session_state.analysis_result:
 
         location_name = res.get("location_name", "Unknown Location")
 
+        def fmt(value, unit):
+            # A raster layer without data at this point comes back as None
+            return "n/a" if value is None else f"{value}{unit}"
+
         st.divider()
         k1, k2 = st.columns(2)
 
@@ -240,15 +530,15 @@ if st.session_state.analysis_result:
                 <div class="stat-container">
                     <div class="stat-item">
                         <div class="stat-label">Winter Low</div>
-                        <div class="stat-value">{climate['min_temp']}°C</div>
+                        <div class="stat-value">{fmt(climate['min_temp'], '°C')}</div>
                     </div>
                     <div class="stat-item">
                         <div class="stat-label">Summer High</div>
-                        <div class="stat-value">{climate['max_temp']}°C</div>
+                        <div class="stat-value">{fmt(climate['max_temp'], '°C')}</div>
                     </div>
                     <div class="stat-item">
                         <div class="stat-label">Annual Rain</div>
-                        <div class="stat-value">{climate['rain']} mm</div>
+                        <div class="stat-value">{fmt(climate['rain'], ' mm')}</div>
                     </div>
                 </div>
             </div>
@@ -280,100 +570,40 @@ if st.session_state.analysis_result:
         # --- ROW 2: MAP & TOP LIST ---
         m1, m2 = st.columns([2.7, 1])
 
-        if not st.session_state.regional_scan.empty:
-            with m1:
-                scan_df = st.session_state.regional_scan
-
-                m_global = folium.Map(
-                    location=[20, 0],
-                    zoom_start=2,
-                    tiles="https://{s}.basemaps.cartocdn.com/light_nolabels/{z}/{x}/{y}{r}.png",
-                    attr="CartoDB",
+        if st.session_state.scan_running:
+            stream_global_scan(m1, m2, location_name, score)
+        else:
+            scan_df = st.session_state.regional_scan
+            if st.session_state.scan_error:
+                m1.error(f"Global scan failed: {st.session_state.scan_error}")
+                if not scan_df.empty:
+                    m1.info(f"Showing the {len(scan_df)} countries scanned before the error.")
+            elif st.session_state.scan_cancelled:
+                m1.info(
+                    f"Scan cancelled: showing the {len(scan_df)} "
+                    "countries scanned so far."
                 )
+            if not scan_df.empty:
+                draw_global_results(m1, m2, scan_df, location_name, score)
 
-                # --- 1. INJECT TITLE (Floating Inside Card) ---
-                title_html = """
-                <div style="
-                    position: fixed; top: 15px; left: 50%; transform: translateX(-50%);
-                    z-index: 1000; background-color: white; padding: 5px 15px;
-                    border: 2px solid black; border-radius: 10px;
-                    font-family: 'Montserrat', sans-serif; font-weight: 900;
-                    font-size: 16px; color: #333; box-shadow: 3px 3px 0px black;">
-                    GLOBAL MAP
-                </div>
-                """
-                m_global.get_root().html.add_child(folium.Element(title_html))
-
-                # --- 2. INJECT LEGEND (Floating Bottom Left) ---
-                legend_html = """
-                <div style="
-                    position: fixed; bottom: 20px; left: 20px; z-index: 1000;
-                    background-color: white; padding: 10px; border: 2px solid black;
-                    border-radius: 10px; font-family: 'Poppins', sans-serif;
-                    box-shadow: 3px 3px 0px black; font-size: 12px;">
-                    <div style="margin-bottom: 5px; font-weight: bold; text-align:center;">SUITABILITY (%)</div>
-                    <div style="display:flex; align-items:center; margin-bottom:3px;">
-                        <span style="background:#BDD409; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> High (>75)
-                    </div>
-                    <div style="display:flex; align-items:center; margin-bottom:3px;">
-                        <span style="background:#1F89D8; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> Medium (75-45)
-                    </div>
-                    <div style="display:flex; align-items:center;">
-                        <span style="background:#E6A8D7; width:15px; height:15px; display:inline-block; border:1px solid black; margin-right:5px;"></span> Low (<45)
-                    </div>
-                </div>
-                """
-                m_global.get_root().html.add_child(folium.Element(legend_html))
-
-                # --- CUSTOM COLOR LOGIC ---
-                score_dict = scan_df.set_index("country")["score"].to_dict()
-
-                def style_function(feature):
-                    country_name = feature["properties"]["name"]
-                    score = score_dict.get(country_name, None)
-                    fill_color = "#f0f0f0"
-
-                    if score is not None:
-                        if score >= 75:
-                            fill_color = "#BDD409"  # C_LIME
-                        elif score >= 45:
-                            fill_color = "#1F89D8"  # C_MED_BLUE
-                        else:
-                            fill_color = "#E6A8D7"  # C_PINK
-
-                    return {
-                        "fillColor": fill_color,
-                        "color": "black",
-                        "weight": 1,
-                        "fillOpacity": 0.8,
-                    }
-
-                folium.GeoJson(
-                    "https://raw.githubusercontent.com/python-visualization/folium/master/examples/data/world-countries.json",
-                    name="Suitability",
-                    style_function=style_function,
-                    tooltip=folium.GeoJsonTooltip(
-                        fields=["name"],
-                        aliases=["Country:"],
-                        style="font-family: Poppins; font-size: 14px;",
-                    ),
-                ).add_to(m_global)
-
-                map_html = m_global.get_root().render()
-
-                map_html = map_html.replace(
-                    "</head>",
-                    "<style>html, body {width: 100%; height: 100%; margin: 0; padding: 0;}</style></head>",
-                )
-
-                components.html(map_html, height=525)
-            with m2:
-                top = backend_api.get_top_countries(
-                    selected_plant, st.session_state.regional_scan
-                )
+        # --- ROW 3: BEST CROPS FOR THIS LOCATION ---
+        ranking = st.session_state.plant_ranking
+        if not ranking.empty:
+            st.markdown(
+                '<h3 class="chart-title">What grows best here?</h3>',
+                unsafe_allow_html=True,
+            )
+            r1, r2 = st.columns([1, 2])
+            with r1:
+                top_n = st.slider("Species shown:", 5, 30, 15)
+                only_ideal = st.checkbox("Only 'Ideal' status", value=False)
+            shown = ranking[ranking["status"] == "Ideal"] if only_ideal else ranking
+            with r2:
                 st.plotly_chart(
-                    create_top_countries_chart(
-                        top, current_name=location_name, current_score=score, height=500
+                    create_top_plants_chart(
+                        shown.head(top_n),
+                        current_name=selected_plant,
+                        height=max(300, 28 * min(top_n, len(shown))),
                     ),
                     use_container_width=True,
                 )
@@ -1,35 +1,258 @@
 import psycopg2
+import psycopg2.pool
 import os
+import json
+import math
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
-from countries import WORLD_LOCATIONS
-from geopy.geocoders import Nominatim
+import geotiff_climate
+import reverse_geocoder
+from countries import WORLD_LOCATIONS, canonical_country
 
 
 # =========================================================
 # 1. DATABASE CONNECTION
 # =========================================================
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "geoplant_db"),
+    "database": os.getenv("DB_NAME", "geoplant"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASS", "admin"),
+}
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_pool = None
+_pool_lock = threading.Lock()
+# psycopg2 pools raise instead of waiting when exhausted, so callers queue here
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+
 def get_db_connection():
     try:
-        return psycopg2.connect(
-            host=os.getenv("DB_HOST", "geoplant_db"),
-            database=os.getenv("DB_NAME", "geoplant"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASS", "admin"),
-        )
+        return psycopg2.connect(**DB_CONFIG)
     except Exception as e:
         print(f"DB Error: {e}")
         return None
 
 
+def get_db_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    Size is controlled by DB_POOL_MIN / DB_POOL_MAX.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = psycopg2.pool.ThreadedConnectionPool(
+                        DB_POOL_MIN, DB_POOL_MAX, **DB_CONFIG
+                    )
+                except Exception as e:
+                    print(f"DB Error: {e}")
+                    return None
+    return _pool
+
+
+def close_db_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+@contextmanager
+def db_connection():
+    """
+    Checks a healthy connection out of the pool and returns it afterwards.
+    Yields None if the database is unreachable, like get_db_connection().
+    """
+    pool = get_db_pool()
+    conn = None
+    has_slot = False
+    if pool is not None:
+        has_slot = _pool_slots.acquire(timeout=DB_POOL_TIMEOUT)
+        if not has_slot:
+            print("DB Error: timed out waiting for a pooled connection")
+        else:
+            try:
+                # After a DB restart every idle connection is stale: drop them
+                # until one answers (at most the whole pool plus a fresh dial)
+                for _ in range(DB_POOL_MAX + 1):
+                    conn = pool.getconn()
+                    if _is_healthy(conn):
+                        break
+                    pool.putconn(conn, close=True)
+                    conn = None
+                else:
+                    raise psycopg2.OperationalError("no healthy pooled connection")
+            except Exception as e:
+                print(f"DB Error: {e}")
+                conn = None
+
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            try:
+                conn.rollback()
+                broken = False
+            except Exception:
+                broken = True
+            pool.putconn(conn, close=broken or bool(conn.closed))
+        if has_slot:
+            _pool_slots.release()
+
+
 # =========================================================
 # 2. LOGIC
 # =========================================================
 
 
+# Status codes of the vectorized scorer. Dead reads "Low Yield" in optimal mode.
+STATUS_IDEAL, STATUS_STRESS, STATUS_RISK, STATUS_DEAD = 0, 1, 2, 3
+STATUS_LABELS = ["Ideal", "Stress", "Risk", "Dead"]
+STATUS_LABELS_OPTIMAL = ["Ideal", "Stress", "Risk", "Low Yield"]
+
+PLANT_THRESHOLDS = [
+    "Min_Temp",
+    "Max_Temp",
+    "Min_Rain",
+    "Max_Rain",
+    "Opt_Min_Temp",
+    "Opt_Max_Temp",
+    "Opt_Min_Rain",
+    "Opt_Max_Rain",
+]
+
+
+def _columns(rows, fields):
+    """List of dicts -> {field: float array}; None becomes NaN."""
+    return {
+        f: np.array([np.nan if r[f] is None else r[f] for r in rows], dtype=float)
+        for f in fields
+    }
+
+
+def plant_columns(plants):
+    """Plant dicts -> threshold columns for score_matrix / score_grid."""
+    return _columns(plants, PLANT_THRESHOLDS)
+
+
+def status_label(code, use_optimal=False):
+    return (STATUS_LABELS_OPTIMAL if use_optimal else STATUS_LABELS)[int(code)]
+
+
+def score_arrays(climate, plants, ignore_drought=False, use_optimal=False):
+    """
+    Vectorized _calculate_single_score.
+    `climate` maps min_temp/max_temp/rain to arrays over P points, `plants`
+    maps the PLANT_THRESHOLDS names to arrays over K plants. Returns
+    (score, status) int arrays of shape (P, K). NaN climate values are not
+    scored, like None in the scalar version.
+    """
+    prefix = "Opt_" if use_optimal else ""
+    t_min, t_max, r_min, r_max = (
+        np.asarray(plants[prefix + f], dtype=float)[np.newaxis, :]
+        for f in ("Min_Temp", "Max_Temp", "Min_Rain", "Max_Rain")
+    )
+    min_temp, max_temp, rain = (
+        np.asarray(climate[f], dtype=float)[:, np.newaxis]
+        for f in ("min_temp", "max_temp", "rain")
+    )
+
+    dead = min_temp < t_min
+    hot = max_temp > t_max
+    dry = rain < r_min
+    if ignore_drought:
+        dry = np.zeros_like(dry)
+    wet = rain > r_max
+
+    score = 100 - 20 * hot - 40 * dry - 10 * wet
+    score = np.where(dead, 0, np.maximum(score, 0)).astype(np.int16)
+
+    status = np.full(score.shape, STATUS_IDEAL, dtype=np.int8)
+    status[hot] = STATUS_STRESS
+    status[dry] = STATUS_RISK
+    status[np.broadcast_to(dead, score.shape)] = STATUS_DEAD
+    return score, status
+
+
+def score_matrix(climate, plants, water_source="Rainfed Only", yield_goal="Survival"):
+    """
+    Vectorized calculate_score_logic over (points x plants), without reasons.
+    Returns (score, status, bonus) arrays of shape (P, K).
+    """
+    use_optimal = yield_goal == "Max Yield (Strict)"
+    score_nat, status_nat = score_arrays(climate, plants, False, use_optimal)
+
+    if water_source != "Irrigated":
+        return score_nat, status_nat, np.zeros_like(score_nat)
+
+    score_irr, status_irr = score_arrays(climate, plants, True, use_optimal)
+    bonus = np.maximum(0, score_irr - score_nat)
+    return score_irr, status_irr, bonus
+
+
+# Score value for pixels without climate data in gridded outputs (uint8)
+NODATA_SCORE = 255
+
+
+def score_grid(raw, plants, water_source="Rainfed Only", yield_goal="Survival"):
+    """
+    Scores a raster window. `raw` is a (6, rows, cols) array of raw layer
+    values (NaN = no data, e.g. from GeoTiffClimate.read_window) and `plants`
+    holds K plants as threshold columns. Returns (score, status) as
+    (K, rows, cols) uint8 arrays, score = NODATA_SCORE where there is no data.
+    """
+    shape = raw.shape[1:]
+    flat = raw.reshape(raw.shape[0], -1)
+    score, status, _ = score_matrix(
+        climate_from_raw_arrays(flat), plants, water_source, yield_goal
+    )
+    score = score.astype(np.uint8)
+    score[np.isnan(flat).all(axis=0)] = NODATA_SCORE
+    return (
+        score.T.reshape((-1,) + shape),
+        status.astype(np.uint8).T.reshape((-1,) + shape),
+    )
+
+
+def _over(value, limit):
+    """value > limit, where a missing value or limit is not scored."""
+    return value is not None and limit is not None and value > limit
+
+
+def _under(value, limit):
+    return value is not None and limit is not None and value < limit
+
+
 def _calculate_single_score(plant, climate, ignore_drought=False, use_optimal=False):
     """
     Calculates score based on either Absolute Limits (Survival)
     OR Optimal Ranges (Thriving).
+    Climate fields that are None (missing raster layer) are not scored.
+    Scalar twin of score_arrays: single lookups stay in plain Python.
     """
     score = 100
     reasons = []
@@ -46,24 +269,23 @@ def _calculate_single_score(plant, climate, ignore_drought=False, use_optimal=Fa
         r_min = plant["Min_Rain"]
         r_max = plant["Max_Rain"]
 
-    if climate["min_temp"] < t_min:
-        score = 0
+    if _under(climate["min_temp"], t_min):
         status = "Dead" if not use_optimal else "Low Yield"
         reasons.append(f"❄️ Too Cold: {climate['min_temp']}°C < {t_min}°C")
         return 0, status, reasons
 
-    if climate["max_temp"] > t_max:
+    if _over(climate["max_temp"], t_max):
         score -= 20
         status = "Stress"
         reasons.append(f"🔥 Too Hot: {climate['max_temp']}°C > {t_max}°C")
 
-    if climate["rain"] < r_min:
+    if _under(climate["rain"], r_min):
         if not ignore_drought:
             score -= 40
             status = "Risk"
             reasons.append(f"🌵 Too Dry: {climate['rain']}mm < {r_min}mm")
 
-    if climate["rain"] > r_max:
+    if _over(climate["rain"], r_max):
         score -= 10
         reasons.append(f"💧 Too Wet: {climate['rain']}mm > {r_max}mm")
 
@@ -81,103 +303,284 @@ def calculate_score_logic(
     score_nat, status_nat, reasons_nat = _calculate_single_score(
         plant, climate, ignore_drought=False, use_optimal=use_optimal
     )
+    if water_source != "Irrigated":
+        return score_nat, status_nat, reasons_nat, 0
 
     score_irr, status_irr, reasons_irr = _calculate_single_score(
         plant, climate, ignore_drought=True, use_optimal=use_optimal
     )
-
-    if water_source == "Irrigated":
-        final_score = score_irr
-        final_status = status_irr
-        final_reasons = reasons_irr
-        bonus = max(0, score_irr - score_nat)
-        if bonus > 0:
-            final_reasons.append(f"💧 Irrigation Bonus: +{bonus}")
-    else:
-        final_score = score_nat
-        final_status = status_nat
-        final_reasons = reasons_nat
-        bonus = 0
-
-    return final_score, final_status, final_reasons, bonus
+    bonus = max(0, score_irr - score_nat)
+    if bonus > 0:
+        reasons_irr.append(f"💧 Irrigation Bonus: +{bonus}")
+    return score_irr, status_irr, reasons_irr, bonus
 
 
 # =========================================================
 # 3. DATA FETCHING
 # =========================================================
-def fetch_climate_data(cursor, lat, lon):
-    lat, lon = float(lat), float(lon)
-    query = """
+# "postgis" (ST_Value on the imported rasters) or "geotiff" (chelsa_raw/ files)
+CLIMATE_BACKEND = os.getenv("CLIMATE_BACKEND", "postgis").lower()
+
+# (result column, raster table) - one PostGIS table per CHELSA layer
+CLIMATE_LAYERS = [
+    ("mean_temp", "climate_temp_mean"),
+    ("min_temp", "climate_temp_min"),
+    ("max_temp", "climate_temp_max"),
+    ("rain", "climate_rain"),
+    ("driest_month_rain", "climate_rain_driest"),
+    ("seasonality", "climate_rain_seasonality"),
+]
+CLIMATE_COLUMNS = [col for col, _ in CLIMATE_LAYERS]
+
+
+def _layer_lookups_sql(geom):
+    """
+    One scalar subselect per layer instead of a six-way cross join.
+    Each ST_Intersects hits the GiST index that raster2pgsql -I builds on
+    ST_ConvexHull(rast), and a layer without a tile just yields NULL.
+    max() picks the non-NULL value when the point sits on a tile border.
+    """
+    return ",\n    ".join(
+        f"(SELECT max(ST_Value(t.rast, {geom})) FROM {table} t "
+        f"WHERE ST_Intersects(t.rast, {geom})) AS {col}"
+        for col, table in CLIMATE_LAYERS
+    )
+
+
+# "layers" (one table per variable) or "cube" (one six-band table, see
+# build_climate_cube.py) - a cube lookup fetches a single tile per point
+CLIMATE_LAYOUT = os.getenv("CLIMATE_LAYOUT", "layers").lower()
+CLIMATE_CUBE_TABLE = "climate_cube"
+
+
+def _cube_lookup_sql(geom):
+    """All six bands from the one cube tile that contains the point."""
+    values = ",\n        ".join(
+        f"ST_Value(t.rast, {band}, {geom}) AS {col}"
+        for band, col in enumerate(CLIMATE_COLUMNS, start=1)
+    )
+    return f"""LEFT JOIN LATERAL (
     SELECT
-        ST_Value(mean.rast, ST_SetSRID(ST_Point(%s, %s), 4326)),
-        ST_Value(min.rast, ST_SetSRID(ST_Point(%s, %s), 4326)),
-        ST_Value(max.rast, ST_SetSRID(ST_Point(%s, %s), 4326)),
-        ST_Value(rain.rast, ST_SetSRID(ST_Point(%s, %s), 4326)),
-        ST_Value(dry.rast, ST_SetSRID(ST_Point(%s, %s), 4326)),
-        ST_Value(seas.rast, ST_SetSRID(ST_Point(%s, %s), 4326))
-    FROM climate_temp_mean mean, climate_temp_min min, climate_temp_max max,
-         climate_rain rain, climate_rain_driest dry, climate_rain_seasonality seas
-    WHERE ST_Intersects(mean.rast, ST_SetSRID(ST_Point(%s, %s), 4326)) AND
-          ST_Intersects(min.rast, ST_SetSRID(ST_Point(%s, %s), 4326)) AND
-          ST_Intersects(max.rast, ST_SetSRID(ST_Point(%s, %s), 4326)) AND
-          ST_Intersects(rain.rast, ST_SetSRID(ST_Point(%s, %s), 4326)) AND
-          ST_Intersects(dry.rast, ST_SetSRID(ST_Point(%s, %s), 4326)) AND
-          ST_Intersects(seas.rast, ST_SetSRID(ST_Point(%s, %s), 4326));
+        {values}
+    FROM {CLIMATE_CUBE_TABLE} t
+    WHERE ST_Intersects(t.rast, {geom})
+    ORDER BY ST_Value(t.rast, 1, {geom}) IS NULL
+    LIMIT 1
+) c ON true"""
+
+
+def climate_tables():
+    """The raster tables the current CLIMATE_LAYOUT reads from."""
+    if CLIMATE_LAYOUT == "cube":
+        return [CLIMATE_CUBE_TABLE]
+    return [table for _, table in CLIMATE_LAYERS]
+
+
+if CLIMATE_LAYOUT == "cube":
+    _CUBE_COLUMNS = ", ".join(f"c.{col}" for col in CLIMATE_COLUMNS)
+
+    POINT_QUERY = f"""
+WITH pt AS (SELECT ST_SetSRID(ST_Point(%s, %s), 4326) AS geom)
+SELECT {_CUBE_COLUMNS}
+FROM pt
+{_cube_lookup_sql("pt.geom")};
+"""
+
+    BATCH_QUERY = f"""
+WITH pts AS (
+    SELECT p.idx, ST_SetSRID(ST_Point(p.lon, p.lat), 4326) AS geom
+    FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS p(idx, lat, lon)
+)
+SELECT pts.idx, {_CUBE_COLUMNS}
+FROM pts
+{_cube_lookup_sql("pts.geom")};
+"""
+else:
+    POINT_QUERY = f"""
+WITH pt AS (SELECT ST_SetSRID(ST_Point(%s, %s), 4326) AS geom)
+SELECT
+    {_layer_lookups_sql("pt.geom")}
+FROM pt;
+"""
+
+    BATCH_QUERY = f"""
+WITH pts AS (
+    SELECT p.idx, ST_SetSRID(ST_Point(p.lon, p.lat), 4326) AS geom
+    FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS p(idx, lat, lon)
+)
+SELECT
+    pts.idx,
+    {_layer_lookups_sql("pts.geom")}
+FROM pts;
+"""
+
+
+def _climate_from_row(row):
     """
-    try:
-        cursor.execute(query, (lon, lat) * 12)
-        row = cursor.fetchone()
-        if not row or row[0] is None:
+    Converts the six raw raster values into human-readable units.
+    A missing layer gives None for its field; no layer at all means ocean.
+    """
+    if not row or all(v is None for v in row):
+        return None
+
+    def temp(v):
+        if v is None:
             return None
+        if v > 1000:
+            return round((v / 10.0) - 273.15, 1)
+        return round(v / 10.0, 1)
 
-        def val(idx, scale=10.0, offset=0):
-            v = row[idx]
-            if v is None:
-                return 0
-            if scale == 10.0 and v > 1000:
-                return (v / 10.0) - 273.15
-            return (v / scale) + offset
-
-        return {
-            "mean_temp": round(val(0), 1),
-            "min_temp": round(val(1), 1),
-            "max_temp": round(val(2), 1),
-            "rain": int(val(3, scale=1.0 if row[3] < 5000 else 10.0)),
-            "driest_month_rain": int(val(4, scale=1.0 if row[4] < 5000 else 10.0)),
-            "seasonality": int(row[5] if row[5] else 0),
-            "ph": 6.5,
-            "humidity": 60,
-            "sun": 80,
-            "elevation": 500,
-        }
-    except:
-        return None
+    def rain(v):
+        if v is None:
+            return None
+        return int(v if v < 5000 else v / 10.0)
 
+    return {
+        "mean_temp": temp(row[0]),
+        "min_temp": temp(row[1]),
+        "max_temp": temp(row[2]),
+        "rain": rain(row[3]),
+        "driest_month_rain": rain(row[4]),
+        "seasonality": int(row[5]) if row[5] is not None else None,
+        "ph": 6.5,
+        "humidity": 60,
+        "sun": 80,
+        "elevation": 500,
+    }
 
-def get_plant_list():
-    conn = get_db_connection()
-    if not conn:
-        return []
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM plants ORDER BY name ASC")
-    res = [r[0] for r in cur.fetchall()]
-    conn.close()
-    return res
 
+def climate_from_raw_arrays(raw):
+    """
+    Array version of _climate_from_row for window reads: `raw` has the six
+    layers on its first axis (NaN = no data). Returns {column: array}.
+    """
+    raw = np.asarray(raw, dtype=float)
 
-def get_plant_rules(plant_name):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    query = """
-        SELECT min_temp_c, max_temp_c, min_rain_mm, max_rain_mm, min_ph, max_ph, opt_min_temp_c, opt_max_temp_c, opt_min_rain_mm, opt_max_rain_mm, opt_min_ph, opt_max_ph
-        FROM plants WHERE name = %s
-    """
-    cur.execute(query, (plant_name,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return None
+    def temp(v):
+        return np.round(np.where(v > 1000, v / 10.0 - 273.15, v / 10.0), 1)
+
+    def rain(v):
+        return np.trunc(np.where(v < 5000, v, v / 10.0))
+
+    return {
+        "mean_temp": temp(raw[0]),
+        "min_temp": temp(raw[1]),
+        "max_temp": temp(raw[2]),
+        "rain": rain(raw[3]),
+        "driest_month_rain": rain(raw[4]),
+        "seasonality": np.trunc(raw[5]),
+    }
+
+
+def _query_point(cursor, lat, lon):
+    cursor.execute(POINT_QUERY, (float(lon), float(lat)))
+    return cursor.fetchone()
+
+
+def _query_points(cursor, lats, lons):
+    """Raw rows for many points in one statement, as (position, values)."""
+    idx = list(range(len(lats)))
+    cursor.execute(BATCH_QUERY, (idx, [float(v) for v in lats], [float(v) for v in lons]))
+    return [(row[0], row[1:]) for row in cursor.fetchall()]
+
+
+def _point_items(points):
+    return list(points.items()) if isinstance(points, dict) else list(enumerate(points))
+
+
+def _climates_from_raw(n, raw_rows):
+    """(position, raw values) pairs -> list of n climate dicts (None = no data)."""
+    climates = [None] * n
+    for idx, raw in raw_rows:
+        climates[idx] = _climate_from_row(raw)
+    return climates
+
+
+def _climate_frame(items, climates):
+    """Builds the keyed climate DataFrame; points without climate are left out."""
+    records = {}
+    for (key, (lat, lon)), climate in zip(items, climates):
+        if climate:
+            records[key] = {"lat": float(lat), "lon": float(lon), **climate}
+
+    if not records:
+        return pd.DataFrame(columns=["lat", "lon"] + CLIMATE_COLUMNS)
+    return pd.DataFrame.from_dict(records, orient="index")
+
+
+def _load_raw_many(lats, lons):
+    """
+    Raw values for many points from the CLIMATE_BACKEND.
+    Returns (pairs, error); failures are reported, never mistaken for ocean.
+    """
+    if CLIMATE_BACKEND == "geotiff":
+        try:
+            return list(enumerate(geotiff_climate.get_reader().sample_many(lats, lons))), None
+        except Exception as e:
+            print(f"Raster Error: {e}")
+            return None, "Climate Data Error"
+
+    with db_connection() as conn:
+        if not conn:
+            return None, "DB Error"
+        try:
+            return _query_points(conn.cursor(), lats, lons), None
+        except Exception as e:
+            print(f"DB Error: {e}")
+            return None, "DB Error"
+
+
+def _load_raw(lat, lon):
+    if CLIMATE_BACKEND == "geotiff":
+        try:
+            return geotiff_climate.get_reader().sample(lat, lon), None
+        except Exception as e:
+            print(f"Raster Error: {e}")
+            return None, "Climate Data Error"
+
+    with db_connection() as conn:
+        if not conn:
+            return None, "DB Error"
+        try:
+            return _query_point(conn.cursor(), lat, lon), None
+        except Exception as e:
+            print(f"DB Error: {e}")
+            return None, "DB Error"
 
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def check_climate_index_usage(cursor, lat=47.3769, lon=8.5417):
+    """
+    Runs EXPLAIN on the point lookup and reports, per raster table, whether
+    the planner reaches it through an index (True) or a sequential scan (False).
+    """
+    cursor.execute("EXPLAIN (FORMAT JSON) " + POINT_QUERY, (float(lon), float(lat)))
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    indexed, seq_scanned = set(), set()
+    for node in _plan_nodes(plan[0]["Plan"]):
+        table = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan":
+            seq_scanned.add(table)
+        elif "Index" in node["Node Type"] or node["Node Type"] == "Bitmap Heap Scan":
+            indexed.add(table)
+    return {
+        table: table in indexed and table not in seq_scanned
+        for table in climate_tables()
+    }
+
+
+PLANT_RULE_COLUMNS = "min_temp_c, max_temp_c, min_rain_mm, max_rain_mm, min_ph, max_ph, opt_min_temp_c, opt_max_temp_c, opt_min_rain_mm, opt_max_rain_mm, opt_min_ph, opt_max_ph"
+
+
+def _plant_from_row(plant_name, row):
     return {
         "name": plant_name,
         # Absolute Limits
@@ -199,15 +602,297 @@ def get_plant_rules(plant_name):
     }
 
 
-def get_location_name(lat, lon):
+# The plants table only changes when clean_and_upload.py runs. It writes a
+# version stamp to plants_meta; we re-read the stamp at most this often.
+PLANT_VERSION_CHECK_SECONDS = float(os.getenv("PLANT_VERSION_CHECK_SECONDS", "60"))
+
+_plant_table = None
+_plant_table_lock = threading.Lock()
+
+
+def _plant_version(cur):
+    try:
+        cur.execute("SELECT version FROM plants_meta WHERE id = 1")
+        row = cur.fetchone()
+        return row[0] if row else None
+    except Exception:
+        # Table not created yet (plants uploaded by an older script)
+        cur.connection.rollback()
+        return None
+
+
+def _build_plant_table(rows, version):
+    plants = [_plant_from_row(r[0], r[1:]) for r in rows]
+    table = _columns(plants, PLANT_THRESHOLDS)
+    table["names"] = np.array([p["name"] for p in plants], dtype=object)
+    table["rows"] = {p["name"]: p for p in plants}
+    table["index"] = {p["name"]: i for i, p in enumerate(plants)}
+    table["version"] = version
+    table["checked_at"] = time.monotonic()
+    return table
+
+
+def get_plant_table():
+    """
+    The whole plants table held in memory:
+    {"names": array, <threshold>: array, "rows": {name: plant dict},
+     "index": {name: position}, "version": stamp}.
+    Column arrays feed score_matrix; "rows" serves get_plant_rules.
+    Reloaded only when the plants_meta version stamp changes.
+    """
+    global _plant_table
+    table = _plant_table
+    if table is not None and time.monotonic() - table["checked_at"] < PLANT_VERSION_CHECK_SECONDS:
+        return table
+
+    with _plant_table_lock:
+        table = _plant_table
+        if table is not None and time.monotonic() - table["checked_at"] < PLANT_VERSION_CHECK_SECONDS:
+            return table
+
+        with db_connection() as conn:
+            if not conn:
+                # Keep serving the last good copy while the DB is away
+                return table
+            cur = conn.cursor()
+            version = _plant_version(cur)
+            if table is not None and version == table["version"]:
+                table["checked_at"] = time.monotonic()
+                return table
+            cur.execute(f"SELECT name, {PLANT_RULE_COLUMNS} FROM plants ORDER BY name ASC")
+            rows = cur.fetchall()
+
+        _plant_table = _build_plant_table(rows, version)
+        return _plant_table
+
+
+def invalidate_plant_table():
+    """Forces the next get_plant_table() call to reload from the DB."""
+    global _plant_table
+    with _plant_table_lock:
+        _plant_table = None
+
+
+def get_plant_list():
+    table = get_plant_table()
+    if table is None:
+        return []
+    return list(table["names"])
+
+
+def get_plant_rules(plant_name):
+    table = get_plant_table()
+    if table is None:
+        return None
+    plant = table["rows"].get(plant_name)
+    # Copy so callers can't modify the shared table
+    return dict(plant) if plant else None
+
+
+# Set GEOCODER_FALLBACK=nominatim to ask OpenStreetMap when the offline
+# lookup finds nothing (needs internet, rate-limited)
+GEOCODER_FALLBACK = os.getenv("GEOCODER_FALLBACK", "none").lower()
+
+
+def _nominatim_country(lat, lon):
+    from geopy.geocoders import Nominatim
+
     try:
         geolocator = Nominatim(user_agent="geoplant_dashboard")
         location = geolocator.reverse((lat, lon), language="en", zoom=3)
         if location:
-            return location.address.split(",")[-1].strip()
-        return "Unknown"
-    except:
-        return "Unknown"
+            return canonical_country(location.address.split(",")[-1].strip())
+    except Exception:
+        pass
+    return None
+
+
+def get_location_name(lat, lon):
+    name = reverse_geocoder.country_at(lat, lon)
+    if not name and GEOCODER_FALLBACK == "nominatim":
+        name = _nominatim_country(lat, lon)
+    return name or "Unknown"
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Written offline by build_country_climate.py
+COUNTRY_CLIMATE_FILE = os.path.join(BASE_DIR, "data", "country_climate.csv")
+COUNTRY_SAMPLES_FILE = os.path.join(BASE_DIR, "data", "country_climate_samples.csv")
+
+_country_climate = None
+
+
+def load_country_climate():
+    """
+    (summary, samples) DataFrames from build_country_climate.py, read once.
+    Returns None when the job has not been run yet.
+    """
+    global _country_climate
+    if _country_climate is None:
+        if not (os.path.exists(COUNTRY_CLIMATE_FILE) and os.path.exists(COUNTRY_SAMPLES_FILE)):
+            return None
+        _country_climate = (
+            pd.read_csv(COUNTRY_CLIMATE_FILE),
+            pd.read_csv(COUNTRY_SAMPLES_FILE),
+        )
+    return _country_climate
+
+
+# =========================================================
+# 4. CACHING
+# =========================================================
+# Users click around the same fields, so lookups are memoized per raster
+# pixel. CHELSA is a 30 arc-second grid (~1 km): 120 pixels per degree.
+CLIMATE_PIXELS_PER_DEG = 120
+CLIMATE_CACHE_SIZE = int(os.getenv("CLIMATE_CACHE_SIZE", "20000"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "2000"))
+
+
+class LRUCache:
+    """Thread-safe LRU dict with hit/miss counters. maxsize=0 disables it."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (found, value) - None is a valid cached value (ocean)."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+_climate_cache = LRUCache(CLIMATE_CACHE_SIZE)
+_analysis_cache = LRUCache(ANALYSIS_CACHE_SIZE)
+
+
+def snap_to_pixel(lat, lon):
+    """(row, col) of the climate pixel that contains the point."""
+    return (
+        int(math.floor((90.0 - float(lat)) * CLIMATE_PIXELS_PER_DEG)),
+        int(math.floor((float(lon) + 180.0) * CLIMATE_PIXELS_PER_DEG)),
+    )
+
+
+def pixel_center(pixel):
+    row, col = pixel
+    return (
+        90.0 - (row + 0.5) / CLIMATE_PIXELS_PER_DEG,
+        -180.0 + (col + 0.5) / CLIMATE_PIXELS_PER_DEG,
+    )
+
+
+def get_cache_stats():
+    """Hit/miss counters of the climate and analysis caches, for sizing them."""
+    return {"climate": _climate_cache.stats(), "analysis": _analysis_cache.stats()}
+
+
+def clear_caches():
+    _climate_cache.clear()
+    _analysis_cache.clear()
+
+
+def load_climate(lat, lon):
+    """
+    Climate for one point from the backend chosen by CLIMATE_BACKEND,
+    memoized per pixel. Returns (climate, error); error is set when the
+    backend is unreachable.
+    """
+    pixel = snap_to_pixel(lat, lon)
+    found, climate = _climate_cache.get(pixel)
+    if not found:
+        raw, error = _load_raw(*pixel_center(pixel))
+        if error:
+            return None, error
+        climate = _climate_from_row(raw)
+        _climate_cache.put(pixel, climate)
+    return (dict(climate) if climate else None), None
+
+
+def _cache_lookup(items):
+    """
+    Climates from the pixel cache for (key, (lat, lon)) items. Returns
+    (climates, misses): None where not cached, and {pixel: positions} still
+    to fetch, so a pixel asked for twice is fetched once.
+    """
+    climates = [None] * len(items)
+    misses = {}
+    for i, (_, (lat, lon)) in enumerate(items):
+        pixel = snap_to_pixel(lat, lon)
+        found, climate = _climate_cache.get(pixel)
+        if found:
+            climates[i] = climate
+        else:
+            misses.setdefault(pixel, []).append(i)
+    return climates, misses
+
+
+def _cache_fill(climates, misses, raw):
+    """Stores the raw rows fetched for `misses` (in order) and fills `climates`."""
+    fetched = _climates_from_raw(len(misses), raw)
+    for (pixel, positions), climate in zip(misses.items(), fetched):
+        for i in positions:
+            climates[i] = climate
+        _climate_cache.put(pixel, climate)
+
+
+def _cached_climates(items):
+    """
+    Climate dicts (None = no data) for (key, (lat, lon)) items: cached pixels
+    from memory, the rest in one backend call. Returns (climates, error).
+    """
+    climates, misses = _cache_lookup(items)
+    if misses:
+        centers = [pixel_center(pixel) for pixel in misses]
+        raw, error = _load_raw_many([c[0] for c in centers], [c[1] for c in centers])
+        if error:
+            return None, error
+        _cache_fill(climates, misses, raw)
+    return climates, None
+
+
+def load_climate_many(points):
+    """
+    Batched load_climate: cached pixels are served from memory, the rest is
+    fetched in one backend call. An unreachable backend gives an empty DataFrame.
+    """
+    items = _point_items(points)
+    climates, error = _cached_climates(items)
+    if error:
+        return pd.DataFrame()
+    return _climate_frame(items, climates)
 
 
 # =========================================================
@@ -216,18 +901,29 @@ def get_location_name(lat, lon):
 def analyze_suitability(
     plant_name, lat, lon, water_source="Rainfed Only", yield_goal="Survival"
 ):
-    conn = get_db_connection()
-    if not conn:
-        return {"error": "DB Error"}
+    # Same pixel + same inputs + same plant data = same answer
+    table = get_plant_table()
+    cache_key = (
+        snap_to_pixel(lat, lon),
+        plant_name,
+        water_source,
+        yield_goal,
+        table["version"] if table else None,
+    )
+    found, cached = _analysis_cache.get(cache_key)
+    if found:
+        return copy.deepcopy(cached)
 
-    cur = conn.cursor()
-    climate = fetch_climate_data(cur, lat, lon)
-    conn.close()
+    climate, error = load_climate(lat, lon)
+    if error:
+        return {"error": error}
 
     plant = get_plant_rules(plant_name)
 
     if not climate:
-        return {"error": "Ocean/No Data"}
+        result = {"error": "Ocean/No Data"}
+        _analysis_cache.put(cache_key, result)
+        return copy.deepcopy(result)
 
     score, status, reasons, bonus = calculate_score_logic(
         plant, climate, water_source, yield_goal
@@ -244,10 +940,157 @@ def analyze_suitability(
         "location_name": loc_name,
         "water_source": water_source,
     }
+    _analysis_cache.put(cache_key, result)
+    return copy.deepcopy(result)
 
-    print(f"\n🐛 DEBUG RESULT OBJECT: {result}\n")
 
-    return result
+def analyze_batch(items, water_source="Rainfed Only", yield_goal="Survival"):
+    """
+    Scores many (lat, lon, plant_name) triples: one batched climate lookup
+    for all points, then one vectorized pass per distinct plant. Returns one
+    dict per triple, in order: {"score", "status", "bonus"} or {"error"}.
+    """
+    table = get_plant_table()
+    if table is None:
+        return [{"error": "DB Error"} for _ in items]
+
+    climates, error = _cached_climates(
+        [(i, (lat, lon)) for i, (lat, lon, _) in enumerate(items)]
+    )
+    if error:
+        return [{"error": error} for _ in items]
+
+    results = [None] * len(items)
+    by_plant = {}
+    for i, ((_, _, plant_name), climate) in enumerate(zip(items, climates)):
+        if plant_name not in table["index"]:
+            results[i] = {"error": "Unknown plant"}
+        elif not climate:
+            results[i] = {"error": "Ocean/No Data"}
+        else:
+            by_plant.setdefault(table["index"][plant_name], []).append(i)
+
+    use_optimal = yield_goal == "Max Yield (Strict)"
+    for k, positions in by_plant.items():
+        score, status, bonus = score_matrix(
+            _columns([climates[i] for i in positions], ["min_temp", "max_temp", "rain"]),
+            {f: table[f][k : k + 1] for f in PLANT_THRESHOLDS},
+            water_source,
+            yield_goal,
+        )
+        for j, i in enumerate(positions):
+            results[i] = {
+                "score": int(score[j, 0]),
+                "status": status_label(status[j, 0], use_optimal),
+                "bonus": int(bonus[j, 0]),
+            }
+    return results
+
+
+SCAN_MODES = ["Country Mean", "Suitable Area", "Centroid"]
+# A country's pixel counts as "suitable" from the medium (blue) band upwards
+SUITABLE_SCORE = 45
+# Live "Centroid" scan: points per chunk and chunks in flight (backend_async)
+SCAN_CHUNK = int(os.getenv("SCAN_CHUNK", "24"))
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))
+
+
+def _async_backend():
+    """backend_async when the concurrent PostGIS path applies, else None."""
+    if CLIMATE_BACKEND != "postgis" or SCAN_CONCURRENCY <= 1:
+        return None
+    try:
+        import backend_async
+    except ImportError:
+        # asyncpg not installed
+        return None
+    return backend_async
+
+
+def _load_centroid_climates():
+    """
+    WORLD_LOCATIONS climates for the live scan. With PostGIS and asyncpg
+    installed the lookups run as concurrent chunks (backend_async), else
+    as one batched query.
+    """
+    backend_async = _async_backend()
+    if backend_async is not None:
+        return backend_async.run(backend_async.load_climate_many_async(WORLD_LOCATIONS))
+    return load_climate_many(WORLD_LOCATIONS)
+
+
+def _iter_centroid_climates(center_lat, center_lon):
+    """
+    Streaming _load_centroid_climates: one climate DataFrame per chunk of
+    SCAN_CHUNK centroids, the countries nearest to the center first.
+    Raises RuntimeError(error label) if the backend fails.
+    """
+    k = math.cos(math.radians(center_lat))
+    items = sorted(
+        WORLD_LOCATIONS.items(),
+        key=lambda item: (item[1][0] - center_lat) ** 2
+        + (((item[1][1] - center_lon + 180) % 360 - 180) * k) ** 2,
+    )
+
+    backend_async = _async_backend()
+    if backend_async is not None:
+        yield from backend_async.iter_run(backend_async.iter_climate_many_async(dict(items)))
+        return
+
+    for start in range(0, len(items), SCAN_CHUNK):
+        part = items[start : start + SCAN_CHUNK]
+        climates, error = _cached_climates(part)
+        if error:
+            raise RuntimeError(error)
+        yield _climate_frame(part, climates)
+
+
+def _score_centroids(plant, climate_df, water_source, yield_goal):
+    """Scan rows from the WORLD_LOCATIONS climate frame."""
+    if climate_df.empty:
+        return pd.DataFrame()
+
+    scores = score_matrix(
+        climate_df, plant_columns([plant]), water_source, yield_goal
+    )[0][:, 0]
+    results = []
+    for country, score in zip(climate_df.index, scores):
+        lat, lon = WORLD_LOCATIONS[country]
+        results.append(
+            {"country": country, "lat": lat, "lon": lon, "score": int(score)}
+        )
+    return pd.DataFrame(results)
+
+
+def _scan_centroids(plant, water_source, yield_goal):
+    """Live scan: one climate lookup per WORLD_LOCATIONS centroid."""
+    return _score_centroids(plant, _load_centroid_climates(), water_source, yield_goal)
+
+
+def _scan_summary(plant, water_source, yield_goal, scan_mode):
+    """Scan from the precomputed country tables: pure in-memory scoring."""
+    summary, samples = load_country_climate()
+    plants = plant_columns([plant])
+
+    if scan_mode == "Suitable Area":
+        scores = score_matrix(samples, plants, water_source, yield_goal)[0][:, 0]
+        suitable = pd.Series(scores >= SUITABLE_SCORE, index=samples["country"])
+        share = suitable.groupby(level=0).mean()
+        score = (share.reindex(summary["country"]).fillna(0) * 100).round()
+    else:
+        climate = {
+            col: summary[f"{col}_mean"] for col in ("min_temp", "max_temp", "rain")
+        }
+        score = score_matrix(climate, plants, water_source, yield_goal)[0][:, 0]
+
+    return pd.DataFrame(
+        {
+            "country": summary["country"].values,
+            "lat": summary["lat"].values,
+            "lon": summary["lon"].values,
+            "score": np.asarray(score, dtype=int),
+        }
+    )
 
 
 def scan_continent_heatmap(
@@ -256,23 +1099,94 @@ def scan_continent_heatmap(
     center_lon,
     water_source="Rainfed Only",
     yield_goal="Survival",
+    scan_mode="Country Mean",
 ):
-    conn = get_db_connection()
-    if not conn:
+    """
+    Scores every country for the global map.
+    scan_mode: "Country Mean" scores each country's average land climate,
+    "Suitable Area" gives the % of its land pixels scoring >= SUITABLE_SCORE
+    (both need the table from build_country_climate.py), "Centroid" looks
+    up one live point per country. Without the table it falls back to
+    "Centroid".
+    """
+    plant = get_plant_rules(plant_name)
+    if not plant:
         return pd.DataFrame()
-    cur = conn.cursor()
+
+    if scan_mode != "Centroid" and load_country_climate() is not None:
+        return _scan_summary(plant, water_source, yield_goal, scan_mode)
+    return _scan_centroids(plant, water_source, yield_goal)
+
+
+def iter_scan_continent_heatmap(
+    plant_name,
+    center_lat,
+    center_lon,
+    water_source="Rainfed Only",
+    yield_goal="Survival",
+    scan_mode="Country Mean",
+):
+    """
+    scan_continent_heatmap as a stream of DataFrames (same columns), so a UI
+    can draw before the whole scan is done. The "Centroid" scan yields a
+    chunk per lookup batch, countries nearest to the center first; the
+    in-memory modes come as a single chunk. If the backend fails part-way it
+    raises RuntimeError with the error label ("DB Error", ...), after the
+    chunks that did arrive. Closing the iterator stops the lookups still
+    running.
+    """
     plant = get_plant_rules(plant_name)
-    results = []
+    if not plant:
+        return
 
-    for country, (lat, lon) in WORLD_LOCATIONS.items():
-        climate = fetch_climate_data(cur, lat, lon)
-        if climate:
-            # Fixed unpacking error
-            score = calculate_score_logic(plant, climate, water_source, yield_goal)[0]
-            results.append({"country": country, "lat": lat, "lon": lon, "score": score})
+    if scan_mode != "Centroid" and load_country_climate() is not None:
+        yield _scan_summary(plant, water_source, yield_goal, scan_mode)
+        return
+    for climate_df in _iter_centroid_climates(center_lat, center_lon):
+        if not climate_df.empty:
+            yield _score_centroids(plant, climate_df, water_source, yield_goal)
 
-    conn.close()
-    return pd.DataFrame(results)
+
+def rank_plants_for_location(
+    lat, lon, water_source="Rainfed Only", yield_goal="Survival", limit=None
+):
+    """
+    "What grows here?" - scores EVERY species for one coordinate in a single
+    vectorized pass (one climate lookup, no per-plant queries).
+    Returns {"climate", "ranking"} where ranking is a DataFrame of
+    name/score/status/bonus sorted best first, or {"error": ...}.
+    """
+    climate, error = load_climate(lat, lon)
+    if error:
+        return {"error": error}
+    if not climate:
+        return {"error": "Ocean/No Data"}
+
+    table = get_plant_table()
+    if table is None:
+        return {"error": "DB Error"}
+
+    use_optimal = yield_goal == "Max Yield (Strict)"
+    score, status, bonus = score_matrix(
+        _columns([climate], ["min_temp", "max_temp", "rain"]),
+        table,
+        water_source,
+        yield_goal,
+    )
+    labels = np.array(STATUS_LABELS_OPTIMAL if use_optimal else STATUS_LABELS)
+
+    ranking = pd.DataFrame(
+        {
+            "name": table["names"],
+            "score": score[0],
+            "status": labels[status[0]],
+            "bonus": bonus[0],
+        }
+    ).sort_values(["score", "name"], ascending=[False, True], ignore_index=True)
+    if limit:
+        ranking = ranking.head(limit)
+
+    return {"climate": climate, "ranking": ranking}
 
 
 def get_top_countries(plant_name, scan_df):
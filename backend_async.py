@@ -0,0 +1,280 @@
+import os
+import re
+import asyncio
+import threading
+import asyncpg
+import pandas as pd
+import backend_api
+from countries import WORLD_LOCATIONS
+
+# =========================================================
+# ASYNC CLIMATE ACCESS (asyncpg)
+# =========================================================
+# The same PostGIS queries as backend_api, on an asyncpg pool, so many
+# lookups can be in flight at once. A large point set (the ~190 country
+# centroids of the live scan) is cut into chunks of SCAN_CHUNK points that
+# run as concurrent queries, at most SCAN_CONCURRENCY at a time, each on its
+# own connection. The scan then takes about as long as its slowest chunk
+# instead of one query walking every point in turn.
+#
+# Results go through backend_api's pixel cache, so sync and async callers
+# share it. Sync code uses run(), which drives the coroutines on one
+# background event loop (and its pool); backend_api's live scan does this
+# automatically when asyncpg is installed. With CLIMATE_BACKEND=geotiff the
+# raster reads run on the default executor instead.
+
+SCAN_CONCURRENCY = backend_api.SCAN_CONCURRENCY
+SCAN_CHUNK = backend_api.SCAN_CHUNK
+ASYNC_POOL_MAX = int(os.getenv("ASYNC_POOL_MAX", str(SCAN_CONCURRENCY)))
+
+
+def _numbered(sql):
+    """psycopg2 %s placeholders -> asyncpg $1, $2, ..."""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", sql)
+
+
+POINT_SQL = _numbered(backend_api.POINT_QUERY)
+BATCH_SQL = _numbered(backend_api.BATCH_QUERY)
+
+
+# =========================================================
+# 1. POOL & EVENT LOOP
+# =========================================================
+# asyncpg pools belong to the event loop that created them: one per loop
+_pools = {}
+_loop = None
+_loop_lock = threading.Lock()
+
+
+async def _create_pool():
+    cfg = backend_api.DB_CONFIG
+    try:
+        return await asyncpg.create_pool(
+            host=cfg["host"],
+            database=cfg["database"],
+            user=cfg["user"],
+            password=cfg["password"],
+            min_size=min(backend_api.DB_POOL_MIN, ASYNC_POOL_MAX),
+            max_size=ASYNC_POOL_MAX,
+        )
+    except Exception as e:
+        print(f"DB Error: {e}")
+        return None
+
+
+async def get_pool():
+    """The asyncpg pool of the running loop, created on first use (None if unreachable)."""
+    loop = asyncio.get_running_loop()
+    if loop not in _pools:
+        # A task, so concurrent first callers wait for the same pool
+        _pools[loop] = loop.create_task(_create_pool())
+    pool = await _pools[loop]
+    if pool is None:
+        _pools.pop(loop, None)  # try again on the next call
+    return pool
+
+
+async def close_pool():
+    task = _pools.pop(asyncio.get_running_loop(), None)
+    if task is not None:
+        pool = await task
+        if pool is not None:
+            await pool.close()
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="backend-async", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run(coro):
+    """Runs a coroutine to completion from sync code, on the shared background loop."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+def iter_run(agen):
+    """
+    Iterates an async generator from sync code, on the shared background
+    loop. Closing the iterator closes the generator.
+    """
+    loop = _background_loop()
+    try:
+        while True:
+            try:
+                item = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+# =========================================================
+# 2. DATA FETCHING
+# =========================================================
+async def _in_executor(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def _load_raw_async(lat, lon):
+    """Async backend_api._load_raw: (raw values, error)."""
+    if backend_api.CLIMATE_BACKEND == "geotiff":
+        return await _in_executor(backend_api._load_raw, lat, lon)
+
+    pool = await get_pool()
+    if pool is None:
+        return None, "DB Error"
+    try:
+        row = await pool.fetchrow(POINT_SQL, float(lon), float(lat))
+    except Exception as e:
+        print(f"DB Error: {e}")
+        return None, "DB Error"
+    return (tuple(row) if row else None), None
+
+
+async def _query_chunk(pool, slots, lats, lons):
+    async with slots:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(BATCH_SQL, list(range(len(lats))), lats, lons)
+    return [(row[0], tuple(row)[1:]) for row in rows]
+
+
+async def _load_raw_many_async(lats, lons, concurrency=SCAN_CONCURRENCY, chunk=SCAN_CHUNK):
+    """
+    Async backend_api._load_raw_many: the points go out as concurrent chunk
+    queries. Returns (position, raw values) pairs and an error; one failed
+    chunk fails the whole call, like the single batched query would.
+    """
+    if backend_api.CLIMATE_BACKEND == "geotiff":
+        return await _in_executor(backend_api._load_raw_many, lats, lons)
+
+    pool = await get_pool()
+    if pool is None:
+        return None, "DB Error"
+
+    lats, lons = [float(v) for v in lats], [float(v) for v in lons]
+    slots = asyncio.Semaphore(concurrency)
+    starts = range(0, len(lats), chunk)
+    try:
+        parts = await asyncio.gather(
+            *(_query_chunk(pool, slots, lats[s : s + chunk], lons[s : s + chunk]) for s in starts)
+        )
+    except Exception as e:
+        print(f"DB Error: {e}")
+        return None, "DB Error"
+    return [(s + i, raw) for s, part in zip(starts, parts) for i, raw in part], None
+
+
+async def fetch_climate_data_async(lat, lon):
+    """Async load_climate (uncached): the climate dict at a point, None for ocean or errors."""
+    raw, error = await _load_raw_async(lat, lon)
+    return None if error else backend_api._climate_from_row(raw)
+
+
+async def load_climate_many_async(points, concurrency=SCAN_CONCURRENCY, chunk=SCAN_CHUNK):
+    """
+    Async backend_api.load_climate_many: cached pixels from memory, the rest
+    as concurrent chunk queries. An unreachable backend gives an empty DataFrame.
+    """
+    items = backend_api._point_items(points)
+    climates, misses = backend_api._cache_lookup(items)
+    if misses:
+        centers = [backend_api.pixel_center(pixel) for pixel in misses]
+        raw, error = await _load_raw_many_async(
+            [c[0] for c in centers], [c[1] for c in centers], concurrency, chunk
+        )
+        if error:
+            return pd.DataFrame()
+        backend_api._cache_fill(climates, misses, raw)
+    return backend_api._climate_frame(items, climates)
+
+
+async def _fetch_chunk(pool, slots, pixels):
+    """(pixels, raw pairs) for one chunk of uncached pixels; pool None = GeoTIFF."""
+    centers = [backend_api.pixel_center(pixel) for pixel in pixels]
+    lats, lons = [c[0] for c in centers], [c[1] for c in centers]
+    if pool is not None:
+        try:
+            return pixels, await _query_chunk(pool, slots, lats, lons)
+        except Exception as e:
+            print(f"DB Error: {e}")
+            raise RuntimeError("DB Error")
+    async with slots:
+        raw, error = await _in_executor(backend_api._load_raw_many, lats, lons)
+    if error:
+        raise RuntimeError(error)
+    return pixels, raw
+
+
+async def iter_climate_many_async(points, concurrency=SCAN_CONCURRENCY, chunk=SCAN_CHUNK):
+    """
+    load_climate_many_async as a stream: yields a climate DataFrame of the
+    cached points first, then one per chunk, in the order of `points`. Up to
+    `concurrency` chunks run ahead while earlier ones are yielded. Raises
+    RuntimeError("DB Error" / "Climate Data Error") if the backend fails;
+    closing the generator cancels the chunks still running.
+    """
+    items = backend_api._point_items(points)
+    climates, misses = backend_api._cache_lookup(items)
+    missing = {i for positions in misses.values() for i in positions}
+    cached = [i for i in range(len(items)) if i not in missing]
+    if cached:
+        yield backend_api._climate_frame([items[i] for i in cached], [climates[i] for i in cached])
+    if not misses:
+        return
+
+    pool = None
+    if backend_api.CLIMATE_BACKEND != "geotiff":
+        pool = await get_pool()
+        if pool is None:
+            raise RuntimeError("DB Error")
+
+    slots = asyncio.Semaphore(concurrency)
+    pixels = list(misses)  # first-seen order, i.e. the order of `points`
+    tasks = [
+        asyncio.ensure_future(_fetch_chunk(pool, slots, pixels[s : s + chunk]))
+        for s in range(0, len(pixels), chunk)
+    ]
+    try:
+        # Awaited in submission order: later chunks keep running meanwhile,
+        # but are never yielded before an earlier one
+        for task in tasks:
+            done, raw = await task
+            part = {pixel: misses[pixel] for pixel in done}
+            backend_api._cache_fill(climates, part, raw)
+            positions = sorted(i for group in part.values() for i in group)
+            yield backend_api._climate_frame(
+                [items[i] for i in positions], [climates[i] for i in positions]
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# =========================================================
+# 3. PUBLIC API
+# =========================================================
+async def scan_continent_heatmap_async(
+    plant_name,
+    center_lat,
+    center_lon,
+    water_source="Rainfed Only",
+    yield_goal="Survival",
+    scan_mode="Country Mean",
+):
+    """Async scan_continent_heatmap; the "Centroid" scan runs its lookups concurrently."""
+    plant = await _in_executor(backend_api.get_plant_rules, plant_name)
+    if not plant:
+        return pd.DataFrame()
+
+    if scan_mode != "Centroid" and await _in_executor(backend_api.load_country_climate) is not None:
+        return backend_api._scan_summary(plant, water_source, yield_goal, scan_mode)
+    climate_df = await load_climate_many_async(WORLD_LOCATIONS)
+    return backend_api._score_centroids(plant, climate_df, water_source, yield_goal)
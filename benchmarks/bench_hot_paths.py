@@ -0,0 +1,203 @@
+import sys
+import timeit
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+import backend_api
+import charts
+from clean_and_upload import clean_ecocrop
+from countries import WORLD_LOCATIONS
+
+# ==========================================
+# CPU HOT-PATH MICROBENCHMARKS
+# ==========================================
+# Per-call CPU time of the scoring and chart-building code that runs on every
+# click, with fixed fixtures built from data/EcoCrop_DB.csv (no database,
+# no rasters). Each case is timed with timeit: autorange for the loop size,
+# then the best of --repeat runs.
+#
+#   python -m benchmarks.bench_hot_paths
+#   python -m benchmarks.bench_hot_paths --csv baseline.csv
+#   python -m benchmarks.bench_hot_paths --baseline baseline.csv --tolerance 0.25
+#
+# With --baseline, cases slower than baseline x (1 + tolerance) are flagged
+# and the script exits with status 1, so it can gate a CI step.
+
+SEED = 42
+N_CLIMATES = 64
+
+
+# ==========================================
+# 1. FIXTURES
+# ==========================================
+def load_plants():
+    """Cleaned EcoCrop rows as plant dicts, like get_plant_rules returns them."""
+    df = clean_ecocrop()
+    cols = [c.strip() for c in backend_api.PLANT_RULE_COLUMNS.split(",")]
+    return [
+        backend_api._plant_from_row(name, [None if pd.isna(v) else float(v) for v in values])
+        for name, values in zip(df["name"], df[cols].itertuples(index=False))
+    ]
+
+
+def make_climates(n=N_CLIMATES, seed=SEED):
+    """Plausible climates (some with a missing layer), as load_climate returns them."""
+    rng = np.random.default_rng(seed)
+    climates = []
+    for i in range(n):
+        mean = float(rng.uniform(-5, 30))
+        climate = {
+            "mean_temp": round(mean, 1),
+            "min_temp": round(mean - rng.uniform(5, 25), 1),
+            "max_temp": round(mean + rng.uniform(5, 15), 1),
+            "rain": int(rng.uniform(50, 3500)),
+            "driest_month_rain": int(rng.uniform(0, 80)),
+            "seasonality": int(rng.uniform(10, 120)),
+            "ph": 6.5,
+            "humidity": 60,
+            "sun": 80,
+            "elevation": 500,
+        }
+        if i % 16 == 0:
+            climate["rain"] = None
+        climates.append(climate)
+    return climates
+
+
+def make_fixtures():
+    plants = load_plants()
+    climates = make_climates()
+    table = backend_api._build_plant_table(
+        [
+            (p["name"], p["Min_Temp"], p["Max_Temp"], p["Min_Rain"], p["Max_Rain"],
+             p["Min_pH"], p["Max_pH"], p["Opt_Min_Temp"], p["Opt_Max_Temp"],
+             p["Opt_Min_Rain"], p["Opt_Max_Rain"], p["Opt_Min_pH"], p["Opt_Max_pH"])
+            for p in plants
+        ],
+        version="bench",
+    )
+
+    # A "Zea mays"-like result object, as analyze_suitability returns it
+    plant = next((p for p in plants if p["name"] == "Zea mays"), plants[0])
+    climate = climates[1]
+    score, status, reasons, bonus = backend_api.calculate_score_logic(
+        plant, climate, "Irrigated", "Survival"
+    )
+    real_data = {
+        "score": score, "status": status, "reasons": reasons, "bonus": bonus,
+        "climate": climate, "plant": plant, "location_name": "Benchland",
+        "water_source": "Irrigated",
+    }
+
+    rng = np.random.default_rng(SEED)
+    scan_df = pd.DataFrame(
+        {
+            "country": list(WORLD_LOCATIONS),
+            "lat": [c[0] for c in WORLD_LOCATIONS.values()],
+            "lon": [c[1] for c in WORLD_LOCATIONS.values()],
+            "score": rng.integers(0, 101, len(WORLD_LOCATIONS)),
+        }
+    )
+    ranking = pd.DataFrame(
+        {"name": [p["name"] for p in plants[:10]], "score": rng.integers(0, 101, 10),
+         "status": "Ideal", "bonus": 0}
+    )
+    return plants, climates, table, real_data, scan_df, ranking
+
+
+# ==========================================
+# 2. CASES
+# ==========================================
+def build_cases(plants, climates, table, real_data, scan_df, ranking):
+    """{name: zero-argument callable}. Scalar cases cycle through the fixtures."""
+    pairs = itertools.cycle(list(zip(itertools.cycle(climates), plants)))
+    top = backend_api.get_top_countries(real_data["plant"]["name"], scan_df)
+    one_climate = backend_api._columns([climates[1]], ["min_temp", "max_temp", "rain"])
+
+    def single_score():
+        climate, plant = next(pairs)
+        return backend_api._calculate_single_score(plant, climate)
+
+    def score_logic(water, goal):
+        def run():
+            climate, plant = next(pairs)
+            return backend_api.calculate_score_logic(plant, climate, water, goal)
+        return run
+
+    return {
+        "_calculate_single_score": single_score,
+        "calculate_score_logic (rainfed, survival)": score_logic("Rainfed Only", "Survival"),
+        "calculate_score_logic (irrigated, max yield)": score_logic("Irrigated", "Max Yield (Strict)"),
+        f"score_matrix (1 point x {len(plants)} plants)": lambda: backend_api.score_matrix(
+            one_climate, table, "Irrigated", "Survival"
+        ),
+        "get_top_countries": lambda: backend_api.get_top_countries("x", scan_df),
+        "charts._convert_real_data_to_df": lambda: charts._convert_real_data_to_df(real_data),
+        "create_circular_gauge": lambda: charts.create_circular_gauge(
+            real_data["score"], real_data=real_data
+        ),
+        "create_radar_chart": lambda: charts.create_radar_chart(
+            real_data["plant"]["name"], "Loc", real_data
+        ),
+        "create_diverging_bar_chart": lambda: charts.create_diverging_bar_chart(
+            real_data["plant"]["name"], "Loc", real_data
+        ),
+        "create_top_countries_chart": lambda: charts.create_top_countries_chart(
+            top, current_name="Benchland", current_score=real_data["score"]
+        ),
+        "create_top_plants_chart": lambda: charts.create_top_plants_chart(
+            ranking, current_name=ranking["name"].iloc[0]
+        ),
+    }
+
+
+# ==========================================
+# 3. RUN & REPORT
+# ==========================================
+def run(cases, repeat=5):
+    rows = []
+    for name, fn in cases.items():
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        rows.append({"case": name, "loops": number, "us_per_call": round(best * 1e6, 1)})
+        print(f"  {name:<48} {best * 1e6:>12.1f} µs")
+    return pd.DataFrame(rows)
+
+
+def compare(report, baseline_path, tolerance):
+    """Flags cases slower than the baseline by more than `tolerance`."""
+    baseline = pd.read_csv(baseline_path).set_index("case")["us_per_call"]
+    regressions = []
+    for case, us in zip(report["case"], report["us_per_call"]):
+        if case in baseline and us > baseline[case] * (1 + tolerance):
+            regressions.append(case)
+            print(f"  ❌ {case}: {baseline[case]} -> {us} µs")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the scoring and chart hot paths.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="only cases containing this text")
+    parser.add_argument("--csv", default=None, help="write the results here")
+    parser.add_argument("--baseline", default=None, help="CSV from an earlier --csv run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    try:
+        cases = build_cases(*make_fixtures())
+        if args.filter:
+            cases = {k: v for k, v in cases.items() if args.filter in k}
+        print("Timing hot paths (best per-call time)...")
+        report = run(cases, args.repeat)
+        if args.csv:
+            report.to_csv(args.csv, index=False)
+            print(f"Saved to {args.csv}")
+        if args.baseline and compare(report, args.baseline, args.tolerance):
+            sys.exit(1)
+        print("✅ SUCCESS!")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(2)
@@ -0,0 +1,210 @@
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import psycopg2
+import backend_api
+import ingest_rasters
+from geotiff_climate import LAYER_FILES
+from benchmarks.synthetic_raster import DEFAULT_BOUNDS, crop_chelsa, write_synthetic
+
+# ==========================================
+# POSTGIS RASTER LAYOUT BENCHMARK
+# ==========================================
+# Loads the same six-layer raster at several tile sizes, with and without
+# overviews, each layout into its own schema (bench_t50, bench_t50_ov, ...)
+# with production table names. backend_api's own POINT_QUERY / BATCH_QUERY
+# then run unchanged against each schema via search_path, on a fixed
+# workload:
+#
+#   point   one POINT_QUERY per click-like lookup
+#   batch   BATCH_QUERY with --batch-size points (scan / ranking path)
+#   window  ST_SummaryStatsAgg of mean temp over a --window-deg box, at full
+#           resolution and, for layouts with overviews, on the coarsest one
+#
+# and reports p50 / p95 latency and throughput per layout.
+#
+#   python -m benchmarks.bench_raster_layout --tile-sizes 25,50,100,250
+#   python -m benchmarks.bench_raster_layout --from-chelsa chelsa_raw --csv layout.csv
+#
+# Needs PostGIS plus raster2pgsql / psql (see ingest_rasters.py).
+
+WINDOW_SQL = """
+WITH env AS (SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom)
+SELECT (ST_SummaryStatsAgg(ST_Clip(t.rast, env.geom), 1, true)).mean
+FROM {table} t, env
+WHERE ST_Intersects(t.rast, env.geom);
+"""
+
+
+def _schema(tile_size, overviews):
+    return f"bench_t{tile_size}{'_ov' if overviews else ''}"
+
+
+def _connect(schema=None):
+    conn = psycopg2.connect(**backend_api.DB_CONFIG)
+    conn.autocommit = True
+    if schema:
+        with conn.cursor() as cur:
+            cur.execute(f"SET search_path TO {schema}, public")
+    return conn
+
+
+def load_layout(directory, tile_size, overviews):
+    """Loads the six layers into a fresh schema. Returns (seconds, bytes)."""
+    schema = _schema(tile_size, overviews)
+    conn = _connect()
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS postgis_raster")
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+
+    files = dict(LAYER_FILES)
+    extra = ["-I", "-C"] + (["-l", overviews] if overviews else [])
+    started = time.perf_counter()
+    for col, table in backend_api.CLIMATE_LAYERS:
+        path = os.path.join(directory, files[col])
+        ingest_rasters.load_raster(path, table, tile_size, schema=schema, extra_args=extra)
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {schema}, public")
+        cur.execute("ANALYZE")
+        cur.execute(
+            "SELECT sum(pg_total_relation_size(c.oid)) FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = %s AND c.relkind = 'r'",
+            (schema,),
+        )
+        size = int(cur.fetchone()[0] or 0)
+    conn.close()
+    return time.perf_counter() - started, size
+
+
+def _timed(fn, items, warmup):
+    for item in items[:warmup]:
+        fn(item)
+    latencies = []
+    for item in items[warmup:]:
+        t = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t)
+    return np.array(latencies)
+
+
+def _row(layout, workload, latencies, units_per_op=1):
+    total = latencies.sum()
+    return {
+        "layout": layout,
+        "workload": workload,
+        "ops": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        # points per second for lookups, windows per second for scans
+        "throughput_per_s": round(len(latencies) * units_per_op / total, 1) if total else None,
+    }
+
+
+def run_workload(tile_size, overviews, points, batch_size, windows, warmup):
+    schema = _schema(tile_size, overviews)
+    conn = _connect(schema)
+    cur = conn.cursor()
+    rows = []
+
+    def point(p):
+        cur.execute(backend_api.POINT_QUERY, (float(p[1]), float(p[0])))
+        return cur.fetchone()
+
+    def batch(b):
+        cur.execute(backend_api.BATCH_QUERY, (list(range(len(b))), b[:, 0].tolist(), b[:, 1].tolist()))
+        return cur.fetchall()
+
+    rows.append(_row(schema, "point", _timed(point, list(points), warmup)))
+    batches = [points[i : i + batch_size] for i in range(0, len(points), batch_size)]
+    rows.append(_row(schema, f"batch x{batch_size}", _timed(batch, batches, 1), batch_size))
+
+    def scan(table):
+        sql = WINDOW_SQL.format(table=table)
+        return lambda w: (cur.execute(sql, tuple(w)), cur.fetchall())
+
+    rows.append(_row(schema, "window", _timed(scan("climate_temp_mean"), windows, 1)))
+    if overviews:
+        coarsest = overviews.split(",")[-1]
+        rows.append(
+            _row(schema, f"window o_{coarsest}", _timed(scan(f"o_{coarsest}_climate_temp_mean"), windows, 1))
+        )
+    conn.close()
+    return rows
+
+
+def main(args):
+    if backend_api.CLIMATE_LAYOUT != "layers":
+        raise ValueError("Run with CLIMATE_LAYOUT=layers (one table per variable)")
+    bounds = tuple(args.bounds)
+    directory = args.raster_dir or tempfile.mkdtemp(prefix="geoplant_bench_")
+    if args.from_chelsa:
+        print(f"Cropping {args.from_chelsa} to {bounds}...")
+        crop_chelsa(directory, bounds, args.from_chelsa)
+    elif not args.raster_dir:
+        print(f"Writing synthetic raster for {bounds}...")
+        write_synthetic(directory, bounds)
+
+    # The same workload for every layout
+    rng = np.random.default_rng(args.seed)
+    west, south, east, north = bounds
+    points = np.column_stack(
+        [rng.uniform(south, north, args.points), rng.uniform(west, east, args.points)]
+    )
+    half = args.window_deg / 2
+    centers = np.column_stack(
+        [
+            rng.uniform(west + half, east - half, args.windows),
+            rng.uniform(south + half, north - half, args.windows),
+        ]
+    )
+    windows = [(x - half, y - half, x + half, y + half) for x, y in centers]
+
+    results, loads = [], []
+    tile_sizes = [int(t) for t in args.tile_sizes.split(",")]
+    for tile_size in tile_sizes:
+        for overviews in [None, args.overviews] if args.overviews else [None]:
+            schema = _schema(tile_size, overviews)
+            print(f"Loading {schema}...")
+            seconds, size = load_layout(directory, tile_size, overviews)
+            loads.append({"layout": schema, "load_s": round(seconds, 1), "size_mb": round(size / 1024**2, 1)})
+            print(f"Running workload on {schema}...")
+            results += run_workload(tile_size, overviews, points, args.batch_size, windows, args.warmup)
+            if not args.keep:
+                conn = _connect()
+                conn.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+                conn.close()
+
+    report = pd.DataFrame(results).merge(pd.DataFrame(loads), on="layout")
+    print()
+    print(report.to_string(index=False))
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+        print(f"\nSaved to {args.csv}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PostGIS raster tile sizes and overviews.")
+    parser.add_argument("--tile-sizes", default="25,50,100,250", help="comma-separated tile edges")
+    parser.add_argument("--overviews", default="2,4,8,16", help="overview factors ('' = none)")
+    parser.add_argument("--bounds", type=float, nargs=4, default=DEFAULT_BOUNDS,
+                        metavar=("WEST", "SOUTH", "EAST", "NORTH"))
+    parser.add_argument("--from-chelsa", default=None, help="crop real CHELSA files instead of synthetic")
+    parser.add_argument("--raster-dir", default=None, help="use an existing fixture directory")
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--windows", type=int, default=30)
+    parser.add_argument("--window-deg", type=float, default=2.0)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", default=None, help="also write the report here")
+    parser.add_argument("--keep", action="store_true", help="keep the bench_* schemas")
+    args = parser.parse_args()
+
+    try:
+        main(args)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -0,0 +1,258 @@
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import psycopg2
+from sqlalchemy import create_engine
+import backend_api
+import ingest_rasters
+from clean_and_upload import iter_clean_ecocrop, upload_plants
+from benchmarks.synthetic_raster import DEFAULT_BOUNDS, write_synthetic
+
+# ==========================================
+# END-TO-END LOAD TEST
+# ==========================================
+# How many concurrent users can one app container serve? Simulated users run
+# as threads in ONE process, like Streamlit sessions, and call the same
+# backend_api functions the app does (so the connection pool and the caches
+# are shared exactly as in production):
+#
+#   analyze  analyze_suitability for a map click. Clicks cluster around a
+#            few hotspots (popular regions, with repeat clicks) plus some
+#            uniform noise, and plants follow a Zipf-like popularity
+#   scan     scan_continent_heatmap, a small share of the actions. Runs in
+#            "Centroid" mode by default, the live DB path: the other modes
+#            are served from memory when data/country_climate.csv exists
+#
+# Concurrency ramps through --levels, --duration seconds each. For every
+# level the report shows throughput, p50 / p95 / p99 latency per action,
+# errors (exceptions, DB / raster errors, empty results), and the peak
+# number of DB connections (total and active) sampled from pg_stat_activity.
+#
+# The fixture is a small PostGIS database: a synthetic CHELSA-like region
+# (benchmarks/synthetic_raster.py) loaded with ingest_rasters.py plus the
+# EcoCrop plants table. Everything is local, no internet needed:
+#
+#   docker compose --profile loadtest run --rm loadtest
+#   python -m benchmarks.load_test --setup --levels 1,4,16,32 --duration 30
+
+HOTSPOTS = 6
+HOTSPOT_SHARE = 0.8  # the rest of the clicks land anywhere in the fixture region
+HOTSPOT_SPREAD_DEG = 0.3
+
+
+# ==========================================
+# 1. FIXTURE
+# ==========================================
+def build_fixture(bounds=DEFAULT_BOUNDS, tile_size=50):
+    """Synthetic rasters + plants table in the database from DB_HOST / DB_NAME."""
+    directory = tempfile.mkdtemp(prefix="geoplant_loadtest_")
+    print(f"Writing synthetic rasters for {bounds}...")
+    write_synthetic(directory, bounds)
+    ingest_rasters.ingest(directory, tile_size=tile_size, workers=3, force=True)
+
+    cfg = backend_api.DB_CONFIG
+    engine = create_engine(
+        f"postgresql+psycopg2://{cfg['user']}:{cfg['password']}@{cfg['host']}/{cfg['database']}"
+    )
+    staged, *_ = upload_plants(engine, iter_clean_ecocrop())
+    print(f"Fixture ready: 6 layers, {staged} plants.")
+
+
+# ==========================================
+# 2. WORKLOAD
+# ==========================================
+class ClickModel:
+    """Realistic click positions and plant choices, seeded per user."""
+
+    def __init__(self, bounds, plants, seed):
+        self.bounds = bounds
+        self.plants = plants
+        west, south, east, north = bounds
+        rng = random.Random(0)  # same hotspots for every user
+        self.hotspots = [
+            (rng.uniform(south, north), rng.uniform(west, east)) for _ in range(HOTSPOTS)
+        ]
+        self.rng = random.Random(seed)
+        # Zipf-like plant popularity: a handful of crops get most of the clicks
+        self.weights = [1.0 / (rank + 1) for rank in range(len(plants))]
+
+    def click(self):
+        west, south, east, north = self.bounds
+        if self.rng.random() < HOTSPOT_SHARE:
+            lat, lon = self.rng.choice(self.hotspots)
+            lat = min(max(self.rng.gauss(lat, HOTSPOT_SPREAD_DEG), south), north)
+            lon = min(max(self.rng.gauss(lon, HOTSPOT_SPREAD_DEG), west), east)
+            return lat, lon
+        return self.rng.uniform(south, north), self.rng.uniform(west, east)
+
+    def plant(self):
+        return self.rng.choices(self.plants, weights=self.weights)[0]
+
+    def settings(self):
+        return (
+            self.rng.choice(["Rainfed Only", "Rainfed Only", "Irrigated"]),
+            self.rng.choice(["Survival", "Survival", "Max Yield (Strict)"]),
+        )
+
+
+def _is_ok(result):
+    """A result the app could show. Ocean clicks are valid answers, not errors."""
+    if result is None:
+        return False
+    if isinstance(result, dict):
+        return result.get("error") in (None, "Ocean/No Data")
+    if isinstance(result, pd.DataFrame):
+        return not result.empty
+    return True
+
+
+def _user(model, scan_share, scan_mode, think_s, stop, results):
+    while not stop.is_set():
+        water, goal = model.settings()
+        plant = model.plant()
+        if model.rng.random() < scan_share:
+            action = "scan"
+            lat, lon = model.click()
+            call = lambda: backend_api.scan_continent_heatmap(
+                plant, lat, lon, water, goal, scan_mode=scan_mode
+            )
+        else:
+            action = "analyze"
+            lat, lon = model.click()
+            call = lambda: backend_api.analyze_suitability(plant, lat, lon, water, goal)
+
+        started = time.perf_counter()
+        try:
+            ok = _is_ok(call())
+        except Exception:
+            ok = False
+        results.append((action, time.perf_counter() - started, ok))
+
+        if think_s:
+            stop.wait(model.rng.expovariate(1.0 / think_s))
+
+
+def _sample_connections(stop, samples, interval=0.5):
+    """pg_stat_activity counts of this database, on a connection outside the pool."""
+    conn = psycopg2.connect(**backend_api.DB_CONFIG)
+    conn.autocommit = True
+    cur = conn.cursor()
+    while not stop.is_set():
+        cur.execute(
+            "SELECT count(*), count(*) FILTER (WHERE state = 'active') "
+            "FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )
+        samples.append(cur.fetchone())
+        stop.wait(interval)
+    conn.close()
+
+
+def run_level(users, duration, bounds, plants, scan_share, scan_mode, think_s, cold=True):
+    if cold:
+        backend_api.clear_caches()
+    stop = threading.Event()
+    results, samples = [], []
+    threads = [
+        threading.Thread(
+            target=_user,
+            args=(ClickModel(bounds, plants, seed=i), scan_share, scan_mode, think_s, stop, results),
+            daemon=True,
+        )
+        for i in range(users)
+    ]
+    sampler = threading.Thread(target=_sample_connections, args=(stop, samples), daemon=True)
+
+    sampler.start()
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    sampler.join()
+
+    rows = []
+    frame = pd.DataFrame(results, columns=["action", "latency", "ok"])
+    for action, group in frame.groupby("action"):
+        lat_ms = group["latency"].to_numpy() * 1000
+        rows.append(
+            {
+                "users": users,
+                "action": action,
+                "requests": len(group),
+                "req_per_s": round(len(group) / elapsed, 1),
+                "p50_ms": round(float(np.percentile(lat_ms, 50)), 1),
+                "p95_ms": round(float(np.percentile(lat_ms, 95)), 1),
+                "p99_ms": round(float(np.percentile(lat_ms, 99)), 1),
+                "errors": int((~group["ok"]).sum()),
+                "db_conn_max": max((s[0] for s in samples), default=0),
+                "db_active_max": max((s[1] for s in samples), default=0),
+            }
+        )
+    return rows
+
+
+def main(args):
+    if args.setup:
+        build_fixture(tuple(args.bounds), args.tile_size)
+
+    plants = backend_api.get_plant_list()
+    if not plants:
+        raise RuntimeError("No plants in the database (run with --setup first)")
+    # Put well-known crops first so the popularity curve favours them
+    popular = [p for p in ["Zea mays", "Triticum aestivum", "Oryza sativa", "Solanum tuberosum"] if p in plants]
+    plants = popular + [p for p in plants if p not in popular]
+
+    print(
+        f"Load test: pool max {backend_api.DB_POOL_MAX}, backend {backend_api.CLIMATE_BACKEND}, "
+        f"{args.duration}s per level, {args.scan_share:.0%} scans ({args.scan_mode})"
+    )
+    if args.scan_mode != "Centroid" and backend_api.load_country_climate() is not None:
+        print("⚠️ WARNING: scans are served from data/country_climate.csv and never reach the DB.")
+    report = []
+    for users in [int(u) for u in args.levels.split(",")]:
+        rows = run_level(
+            users, args.duration, tuple(args.bounds), plants,
+            args.scan_share, args.scan_mode, args.think_ms / 1000.0, cold=not args.warm,
+        )
+        report += rows
+        summary = ", ".join(f"{r['action']} {r['req_per_s']}/s p95 {r['p95_ms']}ms" for r in rows)
+        print(f"  {users:>4} users: {summary}")
+
+    report = pd.DataFrame(report)
+    print()
+    print(report.to_string(index=False))
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+        print(f"\nSaved to {args.csv}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ramp concurrent users against backend_api.")
+    parser.add_argument("--setup", action="store_true", help="(re)build the fixture database first")
+    parser.add_argument("--bounds", type=float, nargs=4, default=DEFAULT_BOUNDS,
+                        metavar=("WEST", "SOUTH", "EAST", "NORTH"))
+    parser.add_argument("--tile-size", type=int, default=50)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="concurrent users per step")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per step")
+    parser.add_argument("--scan-share", type=float, default=0.05, help="fraction of actions that are scans")
+    parser.add_argument("--scan-mode", default="Centroid", choices=backend_api.SCAN_MODES,
+                        help="Centroid = live DB lookups; the others may come from memory")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean pause between actions")
+    parser.add_argument("--warm", action="store_true", help="keep caches between steps")
+    parser.add_argument("--csv", default=None)
+    args = parser.parse_args()
+
+    try:
+        main(args)
+        print("✅ SUCCESS!")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,125 @@
+import os
+import argparse
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import from_bounds
+from geotiff_climate import CHELSA_DIR, LAYER_FILES
+
+# ==========================================
+# BENCHMARK RASTER FIXTURES
+# ==========================================
+# Small stand-ins for chelsa_raw/ so benchmarks don't need the 6 x 2 GB
+# download: either a synthetic region with CHELSA-like values, or a crop of
+# the real files. Both write the six layers under their CHELSA file names,
+# so anything that reads a CHELSA directory can read the fixture.
+#
+#   python -m benchmarks.synthetic_raster /tmp/bench_raster --bounds 0 40 20 50
+#   python -m benchmarks.synthetic_raster /tmp/bench_raster --from-chelsa chelsa_raw
+
+NATIVE_RESOLUTION = 1.0 / 120  # 30 arc-seconds, like CHELSA
+NODATA = -32768
+DEFAULT_BOUNDS = (0.0, 40.0, 20.0, 50.0)  # west, south, east, north (Europe)
+
+
+def _profile(width, height, transform):
+    return dict(
+        driver="GTiff",
+        width=width,
+        height=height,
+        count=1,
+        dtype="int16",
+        nodata=NODATA,
+        crs="EPSG:4326",
+        transform=transform,
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+        compress="deflate",
+    )
+
+
+def write_synthetic(directory, bounds=DEFAULT_BOUNDS, resolution=NATIVE_RESOLUTION, seed=42):
+    """
+    Smooth, plausible climate fields over `bounds` in raw CHELSA units
+    (degC x 10, mm), with a 'sea' in one corner stored as nodata.
+    Returns the list of written paths.
+    """
+    west, south, east, north = bounds
+    width = int(round((east - west) / resolution))
+    height = int(round((north - south) / resolution))
+    rng = np.random.default_rng(seed)
+
+    lats = north - (np.arange(height) + 0.5) * resolution
+    lons = west + (np.arange(width) + 0.5) * resolution
+    lat, lon = np.meshgrid(lats, lons, indexing="ij")
+
+    # Latitude gradient + "mountain" ripples + a little noise
+    ripple = np.sin(lon * 1.7) * np.cos(lat * 2.3) + 0.5 * np.sin(lon * 0.4 + lat * 0.9)
+    mean_temp = 28 - 0.45 * np.abs(lat) - 4 * ripple
+    rain = np.clip(900 + 500 * ripple + 8 * (lon - west), 50, 4500)
+    fields = {
+        "mean_temp": mean_temp * 10,
+        "min_temp": (mean_temp - 12 - 3 * np.abs(ripple)) * 10,
+        "max_temp": (mean_temp + 10 + 2 * ripple) * 10,
+        "rain": rain,
+        "driest_month_rain": rain / 25,
+        "seasonality": np.clip(40 + 30 * ripple, 5, 150),
+    }
+
+    # Everything near the south-west corner is sea
+    sea = np.hypot((lat - south) / (north - south), (lon - west) / (east - west)) < 0.3
+
+    transform = from_origin(west, north, resolution, resolution)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for col, filename in LAYER_FILES:
+        data = fields[col] + rng.normal(0, 2, size=(height, width))
+        data = np.where(sea, NODATA, np.round(data)).astype("int16")
+        path = os.path.join(directory, filename)
+        with rasterio.open(path, "w", **_profile(width, height, transform)) as dst:
+            dst.write(data, 1)
+        paths.append(path)
+    return paths
+
+
+def crop_chelsa(directory, bounds=DEFAULT_BOUNDS, source_dir=CHELSA_DIR):
+    """The real CHELSA layers cropped to `bounds`. Returns the written paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for _, filename in LAYER_FILES:
+        with rasterio.open(os.path.join(source_dir, filename)) as src:
+            window = from_bounds(*bounds, transform=src.transform).round_offsets().round_lengths()
+            profile = src.profile.copy()
+            profile.update(
+                width=window.width,
+                height=window.height,
+                transform=src.window_transform(window),
+                tiled=True,
+                blockxsize=256,
+                blockysize=256,
+                compress="deflate",
+            )
+            path = os.path.join(directory, filename)
+            with rasterio.open(path, "w", **profile) as dst:
+                dst.write(src.read(1, window=window), 1)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a small CHELSA-like raster fixture.")
+    parser.add_argument("output", help="directory for the six layers")
+    parser.add_argument("--bounds", type=float, nargs=4, default=DEFAULT_BOUNDS,
+                        metavar=("WEST", "SOUTH", "EAST", "NORTH"))
+    parser.add_argument("--from-chelsa", default=None, help="crop this CHELSA directory instead")
+    args = parser.parse_args()
+
+    try:
+        if args.from_chelsa:
+            crop_chelsa(args.output, tuple(args.bounds), args.from_chelsa)
+        else:
+            write_synthetic(args.output, tuple(args.bounds))
+        print(f"✅ SUCCESS! Fixture written to {args.output}")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -0,0 +1,88 @@
+import os
+import argparse
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from geotiff_climate import CHELSA_DIR, CUBE_FILE, LAYER_FILES
+
+# ==========================================
+# STACKED CLIMATE CUBE
+# ==========================================
+# Stacks the six CHELSA layers into ONE pixel-interleaved, tiled, compressed
+# GeoTIFF. Every block then holds all six variables for its pixels, so a point
+# or window read costs one block fetch instead of six.
+#
+#   python build_climate_cube.py
+#
+# Use it with CLIMATE_LAYOUT=cube. For the PostGIS backend, import the result
+# as one multi-band table:
+#   python ingest_rasters.py --cube
+
+
+def _common_nodata(dtype):
+    if np.issubdtype(dtype, np.floating):
+        return np.nan
+    info = np.iinfo(dtype)
+    return info.min if info.min < 0 else info.max
+
+
+def build_cube(directory=CHELSA_DIR, out_path=CUBE_FILE, block_rows=1024, tile=256):
+    sources = [rasterio.open(os.path.join(directory, f)) for _, f in LAYER_FILES]
+    try:
+        first = sources[0]
+        for ds in sources[1:]:
+            if ds.shape != first.shape or ds.transform != first.transform:
+                raise ValueError(f"{ds.name} is not on the same grid as {first.name}")
+
+        dtype = np.result_type(*[ds.dtypes[0] for ds in sources])
+        nodata = _common_nodata(dtype)
+
+        profile = first.profile.copy()
+        profile.update(
+            driver="GTiff",
+            count=len(sources),
+            dtype=dtype,
+            nodata=nodata,
+            interleave="pixel",
+            tiled=True,
+            blockxsize=tile,
+            blockysize=tile,
+            compress="deflate",
+            predictor=2 if np.issubdtype(dtype, np.integer) else 3,
+            BIGTIFF="IF_SAFER",
+        )
+
+        print(f"Writing {out_path} ({first.width}x{first.height}, {dtype})...")
+        with rasterio.open(out_path, "w", **profile) as dst:
+            for band, (name, _) in enumerate(LAYER_FILES, start=1):
+                dst.set_band_description(band, name)
+
+            # Bounded memory: one strip of rows at a time
+            for row in range(0, first.height, block_rows):
+                window = Window(0, row, first.width, min(block_rows, first.height - row))
+                stack = np.empty((len(sources), window.height, window.width), dtype)
+                for i, ds in enumerate(sources):
+                    data = ds.read(1, window=window)
+                    if ds.nodata is not None:
+                        data = np.where(data == ds.nodata, nodata, data)
+                    stack[i] = data
+                dst.write(stack, window=window)
+                print(f"  rows {row}-{row + window.height} / {first.height}")
+    finally:
+        for ds in sources:
+            ds.close()
+
+    print(f"✅ SUCCESS! Cube written to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stack the CHELSA layers into one cube.")
+    parser.add_argument("--input-dir", default=CHELSA_DIR)
+    parser.add_argument("--output", default=CUBE_FILE)
+    parser.add_argument("--block-rows", type=int, default=1024)
+    args = parser.parse_args()
+
+    try:
+        build_cube(args.input_dir, args.output, args.block_rows)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -0,0 +1,118 @@
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from rasterio.features import geometry_mask
+from rasterio.transform import from_origin
+import backend_api
+import geotiff_climate
+from reverse_geocoder import COUNTRY_FILE
+
+# ==========================================
+# COUNTRY CLIMATE SUMMARY (offline job)
+# ==========================================
+# Zonal statistics of every bioclim layer over each country's land pixels,
+# so the global scan can score ~190 rows in memory instead of sampling one
+# live centroid per country (Australia's centroid is desert...).
+#
+#   python build_country_climate.py [--resolution 0.1] [--samples 400]
+#
+# Writes data/country_climate.csv (mean + percentiles per layer) and
+# data/country_climate_samples.csv (area-weighted pixel sample per country,
+# used for the "Suitable Area" scan mode). Reads chelsa_raw/ directly.
+
+PERCENTILES = [10, 50, 90]
+
+
+def _country_pixels(reader, geometry, resolution):
+    """Climate arrays of the land pixels inside one country, plus their lats/lons."""
+    coords = geometry["coordinates"]
+    polygons = [coords] if geometry["type"] == "Polygon" else coords
+    points = np.concatenate([np.asarray(p[0]) for p in polygons])
+    west, south = points.min(axis=0)
+    east, north = points.max(axis=0)
+
+    # Snap the window to the output grid so every country uses the same pixels
+    west = np.floor(west / resolution) * resolution
+    north = np.ceil(north / resolution) * resolution
+    cols = max(1, int(np.ceil((east - west) / resolution)))
+    rows = max(1, int(np.ceil((north - south) / resolution)))
+    south = north - rows * resolution
+    east = west + cols * resolution
+
+    raw = reader.read_window((west, south, east, north), out_shape=(rows, cols))
+    transform = from_origin(west, north, resolution, resolution)
+    inside = geometry_mask([geometry], (rows, cols), transform, invert=True)
+    if not inside.any():
+        # Country smaller than one grid cell: take every cell it touches
+        inside = geometry_mask(
+            [geometry], (rows, cols), transform, invert=True, all_touched=True
+        )
+    land = inside & ~np.isnan(raw).all(axis=0)
+
+    lats = north - (np.arange(rows) + 0.5) * resolution
+    lons = west + (np.arange(cols) + 0.5) * resolution
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+
+    climate = backend_api.climate_from_raw_arrays(raw[:, land])
+    return climate, lat_grid[land], lon_grid[land]
+
+
+def build(resolution=0.1, n_samples=400, seed=42):
+    reader = geotiff_climate.get_reader()
+    rng = np.random.default_rng(seed)
+
+    with open(COUNTRY_FILE, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    summary_rows, sample_frames = [], []
+    for feature in features:
+        name = feature["properties"]["name"]
+        climate, lats, lons = _country_pixels(reader, feature["geometry"], resolution)
+        if len(lats) == 0:
+            print(f"  {name}: no land pixels, skipped")
+            continue
+
+        # Degree cells shrink towards the poles: weight pixels by cos(lat)
+        weights = np.cos(np.radians(lats))
+        weights = weights / weights.sum()
+
+        row = {
+            "country": name,
+            "pixels": len(lats),
+            "lat": round(float(np.sum(lats * weights)), 2),
+            "lon": round(float(np.sum(lons * weights)), 2),
+        }
+        for col, values in climate.items():
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            w = weights[valid] / weights[valid].sum()
+            row[f"{col}_mean"] = round(float(np.sum(values[valid] * w)), 1)
+            for p, v in zip(PERCENTILES, np.percentile(values[valid], PERCENTILES)):
+                row[f"{col}_p{p}"] = round(float(v), 1)
+        summary_rows.append(row)
+
+        picks = rng.choice(len(lats), size=min(n_samples, len(lats)), replace=False, p=weights)
+        sample = pd.DataFrame({col: values[picks] for col, values in climate.items()})
+        sample.insert(0, "country", name)
+        sample_frames.append(sample)
+        print(f"  {name}: {len(lats)} pixels")
+
+    summary = pd.DataFrame(summary_rows)
+    samples = pd.concat(sample_frames, ignore_index=True)
+    summary.to_csv(backend_api.COUNTRY_CLIMATE_FILE, index=False)
+    samples.to_csv(backend_api.COUNTRY_SAMPLES_FILE, index=False, float_format="%.1f")
+    print(f"✅ SUCCESS! {len(summary)} countries, {len(samples)} sample pixels.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute per-country climate statistics.")
+    parser.add_argument("--resolution", type=float, default=0.1, help="grid size in degrees")
+    parser.add_argument("--samples", type=int, default=400, help="pixels kept per country")
+    args = parser.parse_args()
+
+    try:
+        build(args.resolution, args.samples)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -0,0 +1,274 @@
+import os
+import json
+import argparse
+from collections import defaultdict
+import numpy as np
+from country_shapes import SHAPES_DIR, SHAPES_FILE, SIMPLIFY_TOLERANCE, TOPOJSON_OBJECT
+from reverse_geocoder import COUNTRY_FILE
+
+# ==========================================
+# SIMPLIFIED COUNTRY SHAPES (offline job)
+# ==========================================
+# Writes the map boundary file of country_shapes.py from the bundled
+# data/world-countries.json. Borders are first split into arcs shared by the
+# neighbouring countries (like TopoJSON), then each arc is simplified once
+# with Douglas-Peucker, so neighbours keep exactly the same border and no
+# gaps or overlaps appear. Rings that collapse are dropped (small islands at
+# low detail), except a country's largest polygon, which is simplified less
+# until it survives. No GIS dependencies.
+#
+#   python build_country_shapes.py [--tolerance 0.2] [--quantization 100000]
+#
+# Re-run (and commit data/country_shapes/) after changing the source file
+# or SIMPLIFY_TOLERANCE.
+
+DECIMALS = 3  # ~100 m, the precision of the source file
+
+
+# ==========================================
+# 1. TOPOLOGY
+# ==========================================
+def _rings(feature):
+    """[[ring, ...] per polygon] with open rings (no repeated closing point)."""
+    geom = feature["geometry"]
+    polygons = geom["coordinates"] if geom["type"] == "MultiPolygon" else [geom["coordinates"]]
+    result = []
+    for polygon in polygons:
+        rings = []
+        for ring in polygon:
+            points = [tuple(p) for p in ring]
+            points = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+            if points[0] == points[-1]:
+                points = points[:-1]
+            if len(points) >= 3:
+                rings.append(points)
+        if rings:
+            result.append(rings)
+    return result
+
+
+def build_topology(features):
+    """
+    Splits every ring into arcs shared between countries.
+    Returns (arcs, shapes): arcs are lists of points, shapes are per country
+    [polygon [ring [arc ref]]] where ~i means arc i reversed.
+    """
+    countries = [_rings(f) for f in features]
+
+    # A junction is a point with more than two distinct neighbours: where a
+    # shared border starts or ends, or where three countries meet.
+    neighbours = defaultdict(set)
+    for polygons in countries:
+        for rings in polygons:
+            for ring in rings:
+                n = len(ring)
+                for i, p in enumerate(ring):
+                    neighbours[p].update((ring[i - 1], ring[(i + 1) % n]))
+    junctions = {p for p, near in neighbours.items() if len(near) > 2}
+
+    arcs, index = [], {}
+
+    def arc_ref(points):
+        key = tuple(points)
+        if key in index:
+            return index[key]
+        if key[::-1] in index:
+            return ~index[key[::-1]]
+        index[key] = len(arcs)
+        arcs.append(points)
+        return index[key]
+
+    shapes = []
+    for polygons in countries:
+        shape = []
+        for rings in polygons:
+            refs = []
+            for ring in rings:
+                cuts = [i for i, p in enumerate(ring) if p in junctions]
+                if not cuts:
+                    # Whole ring is one arc; start at its smallest point so a
+                    # ring shared with an enclave gives the same arc both ways
+                    start = ring.index(min(ring))
+                    ring = ring[start:] + ring[:start]
+                    refs.append([arc_ref(ring + [ring[0]])])
+                    continue
+                ring = ring[cuts[0]:] + ring[: cuts[0]]
+                cuts = [c - cuts[0] for c in cuts] + [len(ring)]
+                closed = ring + [ring[0]]
+                refs.append([arc_ref(closed[a : b + 1]) for a, b in zip(cuts, cuts[1:])])
+            shape.append(refs)
+        shapes.append(shape)
+    return arcs, shapes
+
+
+# ==========================================
+# 2. SIMPLIFICATION
+# ==========================================
+def _douglas_peucker(points, tolerance):
+    """Indices of the points kept by Douglas-Peucker (endpoints always kept)."""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = points[b] - points[a]
+        rel = points[a + 1 : b] - points[a]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            keep[a + 1 + i] = True
+            stack += [(a, a + 1 + i), (a + 1 + i, b)]
+    return keep
+
+
+def simplify_arc(arc, tolerance):
+    if tolerance <= 0 or len(arc) <= 2:
+        return arc
+    points = np.asarray(arc, dtype=float)
+    keep = _douglas_peucker(points, tolerance)
+    return [arc[i] for i in np.flatnonzero(keep)]
+
+
+def _ring_points(refs, arcs):
+    points = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        points += arc[1:] if points else arc
+    return points
+
+
+def _area(points):
+    """Shoelace area of a closed ring, in square degrees."""
+    p = np.asarray(points, dtype=float)
+    return 0.5 * abs(np.dot(p[:-1, 0], p[1:, 1]) - np.dot(p[1:, 0], p[:-1, 1]))
+
+
+def _valid(points):
+    return len(set(points)) >= 3 and _area(points) > 0
+
+
+def simplify(arcs, shapes, tolerance):
+    """
+    (arcs, shapes) at one tolerance. Collapsed holes and small polygons are
+    dropped; each country's largest polygon is re-simplified with a halved
+    tolerance on its arcs until it is still a polygon.
+    """
+    main = [
+        max(range(len(shape)), key=lambda i: _area(_ring_points(shape[i][0], arcs)))
+        for shape in shapes
+    ]
+    tolerances = [tolerance] * len(arcs)
+    while True:
+        simple = [simplify_arc(arc, t) for arc, t in zip(arcs, tolerances)]
+        retry = {
+            ref if ref >= 0 else ~ref
+            for shape, m in zip(shapes, main)
+            if not _valid(_ring_points(shape[m][0], simple))
+            for ref in shape[m][0]
+        }
+        if not retry:
+            break
+        for i in retry:
+            tolerances[i] = tolerances[i] / 2 if tolerances[i] > 1e-4 else 0.0
+
+    result = []
+    for shape, m in zip(shapes, main):
+        polygons = []
+        for i, rings in enumerate(shape):
+            if i != m and not _valid(_ring_points(rings[0], simple)):
+                continue
+            polygons.append(
+                [rings[0]] + [r for r in rings[1:] if _valid(_ring_points(r, simple))]
+            )
+        result.append(polygons)
+    return simple, result
+
+
+# ==========================================
+# 3. OUTPUT
+# ==========================================
+def _geometry(polygons):
+    if len(polygons) == 1:
+        return "Polygon", polygons[0]
+    return "MultiPolygon", polygons
+
+
+def to_topojson(features, arcs, shapes, quantization):
+    """Quantized, delta-encoded TopoJSON with one GeometryCollection."""
+    used = sorted({r if r >= 0 else ~r for s in shapes for p in s for refs in p for r in refs})
+    renumber = {old: new for new, old in enumerate(used)}
+
+    points = np.concatenate([np.asarray(arcs[i], dtype=float) for i in used])
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+
+    encoded = []
+    for i in used:
+        q = np.round((np.asarray(arcs[i], dtype=float) - (x0, y0)) / (kx, ky)).astype(int)
+        # Drop points that quantize onto the previous one (endpoints stay)
+        keep = np.ones(len(q), dtype=bool)
+        keep[1:-1] = np.any(q[1:-1] != q[:-2], axis=1)
+        q = q[keep]
+        delta = np.vstack([q[:1], np.diff(q, axis=0)])
+        encoded.append(delta.tolist())
+
+    geometries = []
+    for feature, polygons in zip(features, shapes):
+        kind, refs = _geometry(
+            [
+                [[renumber[r] if r >= 0 else ~renumber[~r] for r in ring] for ring in rings]
+                for rings in polygons
+            ]
+        )
+        geometries.append(
+            {"type": kind, "id": feature.get("id"), "properties": feature["properties"], "arcs": refs}
+        )
+    return {
+        "type": "Topology",
+        "transform": {"scale": [kx, ky], "translate": [x0, y0]},
+        "objects": {TOPOJSON_OBJECT: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": encoded,
+    }
+
+
+def _write(data, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    return os.path.getsize(path)
+
+
+def main(source=COUNTRY_FILE, tolerance=SIMPLIFY_TOLERANCE, quantization=100000):
+    with open(source, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    arcs, shapes = build_topology(features)
+    print(f"{len(features)} countries, {len(arcs)} arcs, {sum(map(len, arcs))} points")
+
+    os.makedirs(SHAPES_DIR, exist_ok=True)
+    simple, kept = simplify(arcs, shapes, tolerance)
+    simple = [[(round(x, DECIMALS), round(y, DECIMALS)) for x, y in arc] for arc in simple]
+    size = _write(to_topojson(features, simple, kept, quantization), SHAPES_FILE)
+    print(f"  {tolerance}°: {sum(map(len, simple))} points, TopoJSON {size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the simplified country boundary file.")
+    parser.add_argument("--source", default=COUNTRY_FILE)
+    parser.add_argument("--tolerance", type=float, default=SIMPLIFY_TOLERANCE, help="degrees")
+    parser.add_argument("--quantization", type=int, default=100000, help="TopoJSON grid size")
+    args = parser.parse_args()
+
+    try:
+        main(args.source, args.tolerance, args.quantization)
+        print(f"✅ SUCCESS! Written to {SHAPES_FILE}")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -0,0 +1,138 @@
+import os
+import argparse
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import backend_api
+import geotiff_climate
+
+# ==========================================
+# GLOBAL SUITABILITY RASTER (batch job)
+# ==========================================
+# Scores every grid cell on Earth for one plant / water source / yield goal
+# and writes a tiled, compressed uint8 GeoTIFF (0-100, 255 = no data).
+# The grid is cut into windows that are read, scored and returned by a pool
+# of worker processes, so it scales with cores and memory stays bounded by
+# (workers x window size).
+#
+#   python build_suitability_raster.py "Zea mays" --resolution 0.1
+#   python build_suitability_raster.py "Zea mays" --resolution native --water Irrigated
+
+NATIVE_RESOLUTION = 1.0 / backend_api.CLIMATE_PIXELS_PER_DEG  # 30 arc-seconds
+WEST, NORTH = -180.0, 90.0
+
+
+def _score_window(job):
+    """Worker: read one window of all six layers and score it."""
+    window, bounds, plant, water_source, yield_goal = job
+    raw = geotiff_climate.get_reader().read_window(
+        bounds, out_shape=(window.height, window.width)
+    )
+    plants = backend_api.plant_columns([plant])
+    score, _ = backend_api.score_grid(raw, plants, water_source, yield_goal)
+    return window, score[0]
+
+
+def _windows(rows, cols, size, resolution):
+    for row in range(0, rows, size):
+        for col in range(0, cols, size):
+            window = Window(col, row, min(size, cols - col), min(size, rows - row))
+            west = WEST + col * resolution
+            north = NORTH - row * resolution
+            bounds = (
+                west,
+                north - window.height * resolution,
+                west + window.width * resolution,
+                north,
+            )
+            yield window, bounds
+
+
+def build_raster(
+    plant_name,
+    out_path,
+    water_source="Rainfed Only",
+    yield_goal="Survival",
+    resolution=0.1,
+    workers=None,
+    window_size=1024,
+):
+    plant = backend_api.get_plant_rules(plant_name)
+    if not plant:
+        raise ValueError(f"Unknown plant: {plant_name}")
+
+    cols = int(round(360.0 / resolution))
+    rows = int(round(180.0 / resolution))
+    profile = dict(
+        driver="GTiff",
+        width=cols,
+        height=rows,
+        count=1,
+        dtype="uint8",
+        nodata=backend_api.NODATA_SCORE,
+        crs="EPSG:4326",
+        transform=from_origin(WEST, NORTH, resolution, resolution),
+        tiled=True,
+        blockxsize=256,
+        blockysize=256,
+        compress="deflate",
+        predictor=2,
+        BIGTIFF="IF_SAFER",
+    )
+
+    jobs = (
+        (window, bounds, plant, water_source, yield_goal)
+        for window, bounds in _windows(rows, cols, window_size, resolution)
+    )
+    n_windows = len(range(0, rows, window_size)) * len(range(0, cols, window_size))
+
+    print(f"Scoring {plant_name} on a {cols}x{rows} grid ({n_windows} windows)...")
+    with rasterio.open(out_path, "w", **profile) as dst:
+        dst.update_tags(
+            plant=plant_name, water_source=water_source, yield_goal=yield_goal
+        )
+        written = 0
+
+        def write(futures):
+            nonlocal written
+            for future in futures:
+                window, score = future.result()
+                dst.write(score, 1, window=window)
+                written += 1
+                if written % 50 == 0 or written == n_windows:
+                    print(f"  {written}/{n_windows} windows")
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Only a few windows in flight per worker keeps memory bounded
+            max_in_flight = 2 * workers
+            in_flight = set()
+            for job in jobs:
+                in_flight.add(pool.submit(_score_window, job))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    write(done)
+            write(wait(in_flight)[0])
+
+    print(f"✅ SUCCESS! Suitability raster written to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a global suitability raster.")
+    parser.add_argument("plant", help="scientific name as in the plants table")
+    parser.add_argument("--water", default="Rainfed Only", choices=["Rainfed Only", "Irrigated"])
+    parser.add_argument("--goal", default="Survival", choices=["Survival", "Max Yield (Strict)"])
+    parser.add_argument("--resolution", default="0.1", help="degrees per cell, or 'native' (30\")")
+    parser.add_argument("--out", default=None, help="output GeoTIFF (default: <plant>_suitability.tif)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--window", type=int, default=1024, help="window size in cells")
+    args = parser.parse_args()
+
+    res = NATIVE_RESOLUTION if args.resolution == "native" else float(args.resolution)
+    out = args.out or f"{args.plant.replace(' ', '_')}_suitability.tif"
+
+    try:
+        build_raster(args.plant, out, args.water, args.goal, res, args.workers, args.window)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
@@ -47,9 +47,10 @@ def _convert_real_data_to_df(real_data, override_water_source=None):
     p_sun_opt = plant.get("Sun_Need", 80)
     p_hum_opt = plant.get("Ideal_Hum", 50)
 
-    l_temp = climate["mean_temp"]
+    # Missing raster layers come back as None: draw them on the optimum
+    l_temp = climate["mean_temp"] if climate["mean_temp"] is not None else p_temp_opt
 
-    if water_source == "Irrigated":
+    if water_source == "Irrigated" or climate["rain"] is None:
         l_rain = p_rain_opt
     else:
         l_rain = climate["rain"]
@@ -370,3 +371,57 @@ def create_top_countries_chart(
         plot_bgcolor="rgba(0,0,0,0)",
     )
     return fig
+
+
+def create_top_plants_chart(ranking_df, current_name=None, height=500):
+    """
+    Best species for the selected location (reverse ranking).
+    Same color logic as the country ranking; the selected plant is bolded.
+    """
+    if ranking_df.empty:
+        return go.Figure()
+
+    df = ranking_df.sort_values("score", ascending=True)
+
+    colors = []
+    for score in df["score"]:
+        if score >= 75:
+            colors.append(C_LIME)
+        elif score >= 45:
+            colors.append(C_MED_BLUE)
+        else:
+            colors.append(C_PINK)
+
+    labels = [f"<b>{name}</b>" if name == current_name else name for name in df["name"]]
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            y=labels,
+            x=df["score"],
+            orientation="h",
+            marker=dict(color=colors, line=dict(color=C_BLACK, width=2)),
+            text=[f"{x:.0f}%" for x in df["score"]],
+            textposition="auto",
+            textfont=dict(family=FONT_MAIN, size=12, color=C_BLACK),
+            customdata=df["status"],
+            hovertemplate="%{y}: %{x}% (%{customdata})<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=dict(
+            text="<b>BEST CROPS HERE</b>",
+            x=0.45,
+            xanchor="right",
+            y=0.99,
+            font=dict(family="Montserrat", size=16, color="#333"),
+        ),
+        height=height,
+        margin=dict(r=15, t=30, b=10),
+        xaxis=dict(showgrid=False, range=[0, 115], showticklabels=False),
+        yaxis=dict(title="", tickfont=dict(family="Poppins", size=12, color="black")),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={"family": "Poppins"},
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+    return fig
@@ -0,0 +1,24 @@
+import sys
+import backend_api
+
+# ==========================================
+# EXPLAIN-BASED REGRESSION CHECK
+# ==========================================
+# Makes sure every climate layer lookup in _load_raw is served by
+# the GiST index on ST_ConvexHull(rast) and never by a sequential scan.
+# Run after importing rasters:  python check_indexes.py
+
+if __name__ == "__main__":
+    with backend_api.db_connection() as conn:
+        if not conn:
+            print("❌ ERROR: Database not reachable.")
+            sys.exit(2)
+        usage = backend_api.check_climate_index_usage(conn.cursor())
+
+    for table, uses_index in usage.items():
+        print(f"{'✅' if uses_index else '❌'} {table}")
+
+    if not all(usage.values()):
+        print("\nSome layers are scanned sequentially. Was raster2pgsql run with -I?")
+        sys.exit(1)
+    print("\nAll climate lookups use the spatial index.")
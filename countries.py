@@ -158,3 +158,33 @@ WORLD_LOCATIONS = {
     "Zambia": (-13.1, 27.8),
     "Zimbabwe": (-19.0, 29.1),
 }
+
+# Other spellings of the WORLD_LOCATIONS keys (Natural Earth short names and
+# what Nominatim returns), so every lookup ends up on the same key
+COUNTRY_ALIASES = {
+    "Bosnia and Herz.": "Bosnia and Herzegovina",
+    "Central African Rep.": "Central African Republic",
+    "Czechia": "Czech Republic",
+    "Dem. Rep. Congo": "Democratic Republic of the Congo",
+    "DR Congo": "Democratic Republic of the Congo",
+    "Congo-Kinshasa": "Democratic Republic of the Congo",
+    "Congo": "Republic of the Congo",
+    "Congo-Brazzaville": "Republic of the Congo",
+    "Dominican Rep.": "Dominican Republic",
+    "Côte d'Ivoire": "Ivory Coast",
+    "North Macedonia": "Macedonia",
+    "Serbia": "Republic of Serbia",
+    "S. Sudan": "South Sudan",
+    "Tanzania": "United Republic of Tanzania",
+    "United States": "United States of America",
+    "USA": "United States of America",
+    "Russian Federation": "Russia",
+    "Viet Nam": "Vietnam",
+    "Lao PDR": "Laos",
+    "Türkiye": "Turkey",
+}
+
+
+def canonical_country(name):
+    """Maps any known spelling onto the WORLD_LOCATIONS key."""
+    return COUNTRY_ALIASES.get(name, name)
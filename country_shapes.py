@@ -0,0 +1,29 @@
+import os
+import json
+
+# =========================================================
+# BUNDLED COUNTRY SHAPES (map rendering)
+# =========================================================
+# A pre-simplified copy of data/world-countries.json for the choropleth,
+# written by build_country_shapes.py and committed under data/country_shapes/
+# as quantized TopoJSON (shared borders stored once). Names are the same as
+# in the source file, i.e. the WORLD_LOCATIONS keys, so score lookups by
+# name always match.
+#
+# One level of detail: the map HTML is static, so it can't swap shapes when
+# the user zooms. SIMPLIFY_TOLERANCE (~20 km) keeps borders clean at the
+# world view and still acceptable a few zoom levels in.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SHAPES_DIR = os.path.join(BASE_DIR, "data", "country_shapes")
+SHAPES_FILE = os.path.join(SHAPES_DIR, "world-countries.topo.json")
+TOPOJSON_OBJECT = "countries"
+
+# Douglas-Peucker tolerance, in degrees
+SIMPLIFY_TOLERANCE = 0.2
+
+
+def load_shapes():
+    """Parsed country shapes (TopoJSON object path: objects.countries)."""
+    with open(SHAPES_FILE, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,143 @@
+import os
+import threading
+import numpy as np
+
+# =========================================================
+# LOCAL GEOTIFF CLIMATE BACKEND
+# =========================================================
+# Reads the CHELSA rasters in chelsa_raw/ directly instead of going through
+# PostGIS ST_Value. Each file is opened once per process and point lookups are
+# 1x1 windowed reads at the pixel computed from the geotransform, so only the
+# compressed block holding that pixel is touched (GDAL keeps it in its block
+# cache for the next click nearby).
+#
+# With CLIMATE_LAYOUT=cube the six layers are read from the stacked,
+# pixel-interleaved file written by build_climate_cube.py instead, so one
+# block fetch returns all six variables.
+#
+# Returns the same raw values as the PostGIS query, so backend_api converts
+# both with the same code.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHELSA_DIR = os.getenv("CHELSA_DIR", os.path.join(BASE_DIR, "chelsa_raw"))
+CLIMATE_LAYOUT = os.getenv("CLIMATE_LAYOUT", "layers").lower()
+CUBE_FILE = os.getenv("CLIMATE_CUBE_FILE", os.path.join(CHELSA_DIR, "chelsa_cube.tif"))
+
+# Same order as backend_api.CLIMATE_LAYERS (and the bands of the cube)
+LAYER_FILES = [
+    ("mean_temp", "CHELSA_bio01_1981-2010_V.2.1.tif"),
+    ("min_temp", "CHELSA_bio06_1981-2010_V.2.1.tif"),
+    ("max_temp", "CHELSA_bio05_1981-2010_V.2.1.tif"),
+    ("rain", "CHELSA_bio12_1981-2010_V.2.1.tif"),
+    ("driest_month_rain", "CHELSA_bio17_1981-2010_V.2.1.tif"),
+    ("seasonality", "CHELSA_bio15_1981-2010_V.2.1.tif"),
+]
+
+
+def _open(path):
+    import rasterio  # only needed when this backend is selected
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing climate raster: {path}")
+    return rasterio.open(path)
+
+
+class GeoTiffClimate:
+    """Point and window access to the six CHELSA layers stored as GeoTIFF."""
+
+    def __init__(self, directory=CHELSA_DIR, cube_file=None):
+        self.directory = directory
+        if cube_file:
+            self.cube = _open(cube_file)
+            self.datasets = [self.cube]
+        else:
+            self.cube = None
+            self.datasets = [
+                _open(os.path.join(directory, filename)) for _, filename in LAYER_FILES
+            ]
+        # rasterio datasets must not be read from two threads at once
+        self._lock = threading.Lock()
+
+    def _pixel(self, lat, lon):
+        # Geotransform: lon = c + col * a, lat = f + row * e (e is negative).
+        # All layers share the CHELSA grid, so the first one stands for all.
+        ds = self.datasets[0]
+        t = ds.transform
+        col = int(np.floor((lon - t.c) / t.a))
+        row = int(np.floor((lat - t.f) / t.e))
+        if 0 <= row < ds.height and 0 <= col < ds.width:
+            return row, col
+        return None
+
+    def _read_pixel(self, lat, lon):
+        from rasterio.windows import Window
+
+        pixel = self._pixel(lat, lon)
+        if pixel is None:
+            return (None,) * len(LAYER_FILES)
+        row, col = pixel
+        window = Window(col, row, 1, 1)
+
+        if self.cube is not None:
+            values = self.cube.read(window=window)[:, 0, 0]
+            nodata = [self.cube.nodata] * len(values)
+        else:
+            values = [ds.read(1, window=window)[0, 0] for ds in self.datasets]
+            nodata = [ds.nodata for ds in self.datasets]
+
+        return tuple(
+            None if (nd is not None and v == nd) or np.isnan(v) else float(v)
+            for v, nd in zip(values, nodata)
+        )
+
+    def sample(self, lat, lon):
+        """Raw values of the six layers at one point (None where no data)."""
+        with self._lock:
+            return self._read_pixel(float(lat), float(lon))
+
+    def sample_many(self, lats, lons):
+        """Raw values for many points as a list of six-value tuples."""
+        with self._lock:
+            return [
+                self._read_pixel(float(lat), float(lon)) for lat, lon in zip(lats, lons)
+            ]
+
+    def read_window(self, bounds, out_shape=None):
+        """
+        Raw values over bounds=(west, south, east, north) as a float32 array of
+        shape (6, rows, cols), NaN where there is no data. out_shape=(rows, cols)
+        resamples with nearest neighbour (e.g. to a coarser grid).
+        """
+        from rasterio.windows import from_bounds
+        from rasterio.enums import Resampling
+
+        window = from_bounds(*bounds, transform=self.datasets[0].transform)
+        kwargs = dict(
+            window=window, boundless=True, masked=True, resampling=Resampling.nearest
+        )
+        with self._lock:
+            if self.cube is not None:
+                shape = (len(LAYER_FILES),) + tuple(out_shape) if out_shape else None
+                data = self.cube.read(out_shape=shape, **kwargs)
+                return data.astype("float32").filled(np.nan)
+
+            bands = [
+                ds.read(1, out_shape=out_shape, **kwargs).astype("float32").filled(np.nan)
+                for ds in self.datasets
+            ]
+        return np.stack(bands)
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    """Process-wide GeoTiffClimate, opened on first use."""
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                cube = CUBE_FILE if CLIMATE_LAYOUT == "cube" else None
+                _reader = GeoTiffClimate(cube_file=cube)
+    return _reader
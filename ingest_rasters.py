@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import backend_api
+from geotiff_climate import CHELSA_DIR, CUBE_FILE, LAYER_FILES
+
+# ==========================================
+# PARALLEL RASTER INGESTION
+# ==========================================
+# Replaces the six hand-run "raster2pgsql ... | psql" commands of README
+# step 5. Layers load concurrently through a bounded worker pool, each into a
+# <table>_load staging table with COPY (-Y) and without -I/-C, because
+# building the index and constraints once on the finished table is much
+# cheaper than maintaining them while loading. The staging table then replaces
+# the live one in a single transaction, and everything is ANALYZEd at the end.
+#
+# Progress is recorded per layer in raster_ingest_log: a re-run skips layers
+# already loaded from the same file with the same tile size, so a failure only
+# repeats the layer that failed.
+#
+#   python ingest_rasters.py [--tile-size 50] [--workers 3] [--cube] [--force]
+#
+# Needs raster2pgsql and psql (postgis / postgresql-client in the Dockerfile).
+
+INGEST_LOG_SQL = """
+CREATE TABLE IF NOT EXISTS raster_ingest_log (
+    table_name TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    source_size BIGINT NOT NULL,
+    source_mtime DOUBLE PRECISION NOT NULL,
+    tile_size INT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+"""
+
+
+def _layers(directory, include_cube=False):
+    """(table, source file) pairs for the CHELSA layers (and the cube)."""
+    files = dict(LAYER_FILES)
+    layers = [
+        (table, os.path.join(directory, files[col]))
+        for col, table in backend_api.CLIMATE_LAYERS
+    ]
+    if include_cube:
+        layers.append(
+            (backend_api.CLIMATE_CUBE_TABLE, os.path.join(directory, os.path.basename(CUBE_FILE)))
+        )
+    return layers
+
+
+def _fingerprint(path, tile_size):
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime, tile_size
+
+
+def _sql(statements, params=None):
+    """Runs statements in one committed transaction; returns the last fetch."""
+    with backend_api.db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database not reachable")
+        cur = conn.cursor()
+        cur.execute(statements, params)
+        rows = cur.fetchall() if cur.description else None
+        conn.commit()
+        return rows
+
+
+def _is_done(table, fingerprint):
+    rows = _sql(
+        "SELECT source, source_size, source_mtime, tile_size FROM raster_ingest_log "
+        "WHERE table_name = %s AND status = 'done'",
+        (table,),
+    )
+    return bool(rows) and tuple(rows[0]) == fingerprint
+
+
+def _log(table, fingerprint, status, error=None):
+    _sql(
+        """
+INSERT INTO raster_ingest_log
+    (table_name, source, source_size, source_mtime, tile_size, status, error)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (table_name) DO UPDATE SET
+    source = EXCLUDED.source, source_size = EXCLUDED.source_size,
+    source_mtime = EXCLUDED.source_mtime, tile_size = EXCLUDED.tile_size,
+    status = EXCLUDED.status, error = EXCLUDED.error,
+    started_at = CASE WHEN EXCLUDED.status = 'loading' THEN now()
+                      ELSE raster_ingest_log.started_at END,
+    finished_at = CASE WHEN EXCLUDED.status = 'loading' THEN NULL ELSE now() END;
+""",
+        (table, *fingerprint, status, error),
+    )
+
+
+def _psql_env():
+    env = dict(os.environ)
+    env.update(
+        PGHOST=backend_api.DB_CONFIG["host"],
+        PGDATABASE=backend_api.DB_CONFIG["database"],
+        PGUSER=backend_api.DB_CONFIG["user"],
+        PGPASSWORD=backend_api.DB_CONFIG["password"],
+    )
+    return env
+
+
+def load_raster(path, staging, tile_size, schema="public", extra_args=()):
+    """raster2pgsql | psql into a fresh staging table (no index/constraints yet)."""
+    dump = subprocess.Popen(
+        [
+            "raster2pgsql", "-s", "4326", "-d", "-Y",
+            "-t", f"{tile_size}x{tile_size}", *extra_args,
+            path, f"{schema}.{staging}",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    load = subprocess.run(
+        ["psql", "-q", "-v", "ON_ERROR_STOP=1"],
+        stdin=dump.stdout,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=_psql_env(),
+    )
+    dump.stdout.close()
+    dump_err = dump.stderr.read().decode(errors="replace")
+    if dump.wait() != 0:
+        raise RuntimeError(f"raster2pgsql failed: {dump_err.strip()[-500:]}")
+    if load.returncode != 0:
+        raise RuntimeError(f"psql failed: {load.stderr.decode(errors='replace').strip()[-500:]}")
+
+
+def _finish(table, staging):
+    """Index + constraints on the loaded table, then swap it in atomically."""
+    _sql(
+        f"""
+CREATE INDEX {staging}_rast_gist ON {staging} USING gist (ST_ConvexHull(rast));
+SELECT AddRasterConstraints('public', '{staging}', 'rast');
+"""
+    )
+    _sql(
+        f"""
+DROP TABLE IF EXISTS {table};
+ALTER TABLE {staging} RENAME TO {table};
+ALTER INDEX {staging}_rast_gist RENAME TO {table}_rast_gist;
+"""
+    )
+
+
+def ingest_layer(table, path, tile_size, force=False):
+    """Loads one layer unless the log says it is already up to date."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing raster: {path}")
+    fingerprint = _fingerprint(path, tile_size)
+    if not force and _is_done(table, fingerprint):
+        return "skipped"
+
+    staging = f"{table}_load"
+    _log(table, fingerprint, "loading")
+    started = time.perf_counter()
+    try:
+        load_raster(path, staging, tile_size)
+        _finish(table, staging)
+    except Exception as e:
+        _log(table, fingerprint, "failed", str(e))
+        raise
+    _log(table, fingerprint, "done")
+    return f"loaded in {time.perf_counter() - started:.0f}s"
+
+
+def ingest(directory=CHELSA_DIR, tile_size=50, workers=3, include_cube=False, force=False):
+    _sql(
+        "CREATE EXTENSION IF NOT EXISTS postgis;"
+        "CREATE EXTENSION IF NOT EXISTS postgis_raster;" + INGEST_LOG_SQL
+    )
+    layers = _layers(directory, include_cube)
+    print(f"Ingesting {len(layers)} layers ({tile_size}x{tile_size} tiles, {workers} at a time)...")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(ingest_layer, table, path, tile_size, force): table
+            for table, path in layers
+        }
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                print(f"  ✅ {table}: {future.result()}")
+            except Exception as e:
+                print(f"  ❌ {table}: {e}")
+                failed.append(table)
+
+    # Fresh statistics so the planner picks the GiST index right away
+    tables = [t for t, _ in layers if t not in failed]
+    for table in tables:
+        _sql(f"ANALYZE {table}")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} layer(s) failed: {', '.join(failed)} (re-run to resume)")
+    print(f"✅ SUCCESS! {len(tables)} layers ready.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the CHELSA rasters into PostGIS.")
+    parser.add_argument("--input-dir", default=CHELSA_DIR)
+    parser.add_argument("--tile-size", type=int, default=50, help="raster2pgsql tile edge in pixels")
+    parser.add_argument("--workers", type=int, default=3, help="layers loaded at the same time")
+    parser.add_argument("--cube", action="store_true", help="also load chelsa_cube.tif")
+    parser.add_argument("--force", action="store_true", help="reload layers already done")
+    args = parser.parse_args()
+
+    try:
+        ingest(args.input_dir, args.tile_size, args.workers, args.cube, args.force)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
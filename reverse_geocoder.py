@@ -0,0 +1,114 @@
+import os
+import json
+import threading
+import numpy as np
+from collections import defaultdict
+
+# =========================================================
+# OFFLINE REVERSE GEOCODER
+# =========================================================
+# Point-in-polygon country lookup over the bundled Natural Earth boundaries in
+# data/world-countries.json (names already match the WORLD_LOCATIONS keys).
+# A 5° grid bucket index narrows each lookup to the few countries whose
+# bounding box touches the cell, then a vectorized even-odd crossing test
+# decides. No network, sub-millisecond.
+#
+# Known limit: the source borders are generalized (~10 km), so a point within
+# a few km of a border can land in the neighbour. It matters for narrow
+# countries: the Gambia centroid in countries.py (13.4, -15.3) lies just
+# south of the generalized Gambia polygon and resolves to Senegal. Nominatim
+# (GEOCODER_FALLBACK) is only asked when no country matches, so it won't
+# correct this either.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COUNTRY_FILE = os.path.join(BASE_DIR, "data", "world-countries.json")
+
+GRID_DEG = 5.0
+# Clicks just off a (generalized) coastline still resolve to the nearest country
+COAST_TOLERANCE_DEG = 0.5
+
+
+def _cell(lon, lat):
+    return int(np.floor(lon / GRID_DEG)), int(np.floor(lat / GRID_DEG))
+
+
+class CountryIndex:
+    def __init__(self, path=COUNTRY_FILE):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+
+        self.names = []
+        self.edges = []  # per country: (x1, y1, x2, y2) arrays over all rings
+        self.grid = defaultdict(list)
+
+        for feature in features:
+            geom = feature["geometry"]
+            polygons = geom["coordinates"]
+            if geom["type"] == "Polygon":
+                polygons = [polygons]
+
+            # Even-odd over ALL rings of all parts handles holes and islands
+            starts, ends = [], []
+            for polygon in polygons:
+                for ring in polygon:
+                    ring = np.asarray(ring, dtype=float)
+                    starts.append(ring)
+                    ends.append(np.roll(ring, -1, axis=0))
+            a, b = np.concatenate(starts), np.concatenate(ends)
+            idx = len(self.names)
+            self.names.append(feature["properties"]["name"])
+            self.edges.append((a[:, 0], a[:, 1], b[:, 0], b[:, 1]))
+
+            (x0, y0), (x1, y1) = a.min(axis=0), a.max(axis=0)
+            cx0, cy0 = _cell(x0 - COAST_TOLERANCE_DEG, y0 - COAST_TOLERANCE_DEG)
+            cx1, cy1 = _cell(x1 + COAST_TOLERANCE_DEG, y1 + COAST_TOLERANCE_DEG)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.grid[(cx, cy)].append(idx)
+
+    def _contains(self, idx, lon, lat):
+        x1, y1, x2, y2 = self.edges[idx]
+        crosses = (y1 > lat) != (y2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+        return np.count_nonzero(crosses & (lon < x_cross)) % 2 == 1
+
+    def _distance(self, idx, lon, lat):
+        """Approximate distance in degrees from the point to the border."""
+        x1, y1, x2, y2 = self.edges[idx]
+        k = np.cos(np.radians(lat))  # shrink longitude degrees away from the equator
+        dx, dy = (x2 - x1) * k, y2 - y1
+        px, py = (lon - x1) * k, lat - y1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip((px * dx + py * dy) / (dx * dx + dy * dy), 0, 1)
+        t = np.nan_to_num(t)
+        return float(np.min(np.hypot(px - t * dx, py - t * dy)))
+
+    def lookup(self, lat, lon):
+        """Country name at (lat, lon), or None over the ocean."""
+        lat, lon = float(lat), float(lon)
+        candidates = self.grid.get(_cell(lon, lat), [])
+        for idx in candidates:
+            if self._contains(idx, lon, lat):
+                return self.names[idx]
+
+        best, best_dist = None, COAST_TOLERANCE_DEG
+        for idx in candidates:
+            dist = self._distance(idx, lon, lat)
+            if dist <= best_dist:
+                best, best_dist = self.names[idx], dist
+        return best
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def country_at(lat, lon):
+    """Offline country lookup using the process-wide CountryIndex."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CountryIndex()
+    return _index.lookup(lat, lon)
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import backend_api
+import geotiff_climate
+
+# ==========================================
+# PRECOMPUTED SUITABILITY CUBE
+# ==========================================
+# Scores every plant in the plants table on a coarse global grid, for each
+# water source / yield goal combination, and stores the result as memory-mapped
+# uint8 arrays (scores are 0-100, 255 = no data):
+#
+#   data/suitability/<mode>_score.npy    (plants, rows, cols)  uint8
+#   data/suitability/<mode>_status.npy   (plants, rows, ceil(cols / 4)) uint8,
+#                                        2-bit status codes, 4 cells per byte
+#   data/suitability/meta.json           grid, plant order, plants version
+#
+# "Where can X grow?" is then one contiguous (rows, cols) slice and
+# "What grows at Y?" one (plants,) slice, with no scoring at request time.
+#
+#   python suitability_cube.py --resolution 0.5
+#
+# Size per mode is plants x rows x cols bytes (~650 MB for 2,500 plants at
+# 0.5 deg), read lazily through the page cache.
+
+SUITABILITY_DIR = os.getenv(
+    "SUITABILITY_DIR", os.path.join(backend_api.BASE_DIR, "data", "suitability")
+)
+WEST, NORTH = -180.0, 90.0
+
+# (water_source, yield_goal) -> file prefix
+MODES = {
+    ("Rainfed Only", "Survival"): "rainfed_survival",
+    ("Rainfed Only", "Max Yield (Strict)"): "rainfed_max_yield",
+    ("Irrigated", "Survival"): "irrigated_survival",
+    ("Irrigated", "Max Yield (Strict)"): "irrigated_max_yield",
+}
+
+
+# ==========================================
+# 1. STATUS BIT-PACKING
+# ==========================================
+# status_map() marks cells without climate data (ocean) with this code
+STATUS_NODATA = backend_api.NODATA_SCORE
+
+
+def pack_status(status):
+    """(..., cols) status codes 0-3 -> (..., ceil(cols / 4)) uint8, 2 bits each."""
+    cols = status.shape[-1]
+    pad = (-cols) % 4
+    if pad:
+        status = np.concatenate(
+            [status, np.zeros(status.shape[:-1] + (pad,), dtype=status.dtype)], axis=-1
+        )
+    s = status.astype(np.uint8).reshape(status.shape[:-1] + (-1, 4))
+    return s[..., 0] | (s[..., 1] << 2) | (s[..., 2] << 4) | (s[..., 3] << 6)
+
+
+def unpack_status(packed, cols):
+    """Inverse of pack_status, trimmed back to `cols` cells."""
+    shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+    s = (packed[..., np.newaxis] >> shifts) & 0b11
+    return s.reshape(packed.shape[:-1] + (-1,))[..., :cols]
+
+
+# ==========================================
+# 2. BUILD
+# ==========================================
+def _files(directory, mode):
+    prefix = os.path.join(directory, MODES[mode])
+    return f"{prefix}_score.npy", f"{prefix}_status.npy"
+
+
+def build_cube(
+    resolution=0.5, directory=SUITABILITY_DIR, strip_rows=20, plant_chunk=256
+):
+    table = backend_api.get_plant_table()
+    if table is None:
+        raise RuntimeError("Plants table unavailable (DB down?)")
+    names = list(table["names"])
+    thresholds = {f: table[f] for f in backend_api.PLANT_THRESHOLDS}
+
+    rows = int(round(180.0 / resolution))
+    cols = int(round(360.0 / resolution))
+    packed_cols = (cols + 3) // 4
+    os.makedirs(directory, exist_ok=True)
+
+    # Write to *.partial and rename at the end, so readers never see half a cube
+    arrays = {}
+    for mode in MODES:
+        score_path, status_path = _files(directory, mode)
+        arrays[mode] = (
+            np.lib.format.open_memmap(
+                score_path + ".partial", "w+", np.uint8, (len(names), rows, cols)
+            ),
+            np.lib.format.open_memmap(
+                status_path + ".partial", "w+", np.uint8, (len(names), rows, packed_cols)
+            ),
+        )
+
+    reader = geotiff_climate.get_reader()
+    print(f"Scoring {len(names)} plants x {len(MODES)} modes on a {cols}x{rows} grid...")
+    for row in range(0, rows, strip_rows):
+        height = min(strip_rows, rows - row)
+        north = NORTH - row * resolution
+        bounds = (WEST, north - height * resolution, WEST + cols * resolution, north)
+        # One climate read per strip, shared by every plant and mode
+        raw = reader.read_window(bounds, out_shape=(height, cols))
+
+        for start in range(0, len(names), plant_chunk):
+            stop = min(start + plant_chunk, len(names))
+            plants = {f: v[start:stop] for f, v in thresholds.items()}
+            for (water, goal), (score_arr, status_arr) in arrays.items():
+                score, status = backend_api.score_grid(raw, plants, water, goal)
+                score_arr[start:stop, row : row + height] = score
+                status_arr[start:stop, row : row + height] = pack_status(status)
+
+        print(f"  rows {row + height}/{rows}")
+
+    for score_arr, status_arr in arrays.values():
+        score_arr.flush()
+        status_arr.flush()
+    arrays.clear()
+    for mode in MODES:
+        for path in _files(directory, mode):
+            os.replace(path + ".partial", path)
+
+    meta = {
+        "resolution": resolution,
+        "west": WEST,
+        "north": NORTH,
+        "rows": rows,
+        "cols": cols,
+        "plants": names,
+        "plants_version": table["version"],
+        "modes": {f"{w}|{g}": prefix for (w, g), prefix in MODES.items()},
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    print(f"✅ SUCCESS! Suitability cube written to {directory}")
+
+
+# ==========================================
+# 3. READ
+# ==========================================
+class SuitabilityCube:
+    """Read-only, memory-mapped access to a cube written by build_cube."""
+
+    def __init__(self, directory=SUITABILITY_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.plants = self.meta["plants"]
+        self.index = {name: i for i, name in enumerate(self.plants)}
+        self.resolution = self.meta["resolution"]
+        self.plants_version = self.meta.get("plants_version")
+        self._arrays = {}
+
+    def _mode(self, water_source, yield_goal):
+        mode = (water_source, yield_goal)
+        if mode not in self._arrays:
+            score_path, status_path = _files(self.directory, mode)
+            self._arrays[mode] = (
+                np.load(score_path, mmap_mode="r"),
+                np.load(status_path, mmap_mode="r"),
+            )
+        return self._arrays[mode]
+
+    def cell(self, lat, lon):
+        """(row, col) of the grid cell holding a point."""
+        row = int((self.meta["north"] - lat) / self.resolution)
+        col = int((lon - self.meta["west"]) / self.resolution)
+        return (
+            min(max(row, 0), self.meta["rows"] - 1),
+            min(max(col, 0), self.meta["cols"] - 1),
+        )
+
+    def plant_map(self, plant_name, water_source="Rainfed Only", yield_goal="Survival"):
+        """Where can X grow: (rows, cols) uint8 scores, 255 = no data."""
+        return self._mode(water_source, yield_goal)[0][self.index[plant_name]]
+
+    def status_map(self, plant_name, water_source="Rainfed Only", yield_goal="Survival"):
+        """
+        (rows, cols) status codes (see backend_api.STATUS_LABELS), STATUS_NODATA
+        where there is no data. The 2-bit layer has no nodata code of its own,
+        so those cells are taken from the score layer.
+        """
+        score_arr, status_arr = self._mode(water_source, yield_goal)
+        i = self.index[plant_name]
+        status = unpack_status(status_arr[i], self.meta["cols"])
+        status[score_arr[i] == backend_api.NODATA_SCORE] = STATUS_NODATA
+        return status
+
+    def plants_at(self, lat, lon, water_source="Rainfed Only", yield_goal="Survival"):
+        """What grows at Y: every plant's score and status at one cell, best first."""
+        score_arr, status_arr = self._mode(water_source, yield_goal)
+        row, col = self.cell(lat, lon)
+        score = np.asarray(score_arr[:, row, col])
+        status = (np.asarray(status_arr[:, row, col // 4]) >> (2 * (col % 4))) & 0b11
+
+        df = pd.DataFrame({"name": self.plants, "score": score, "status": status})
+        df = df[df["score"] != backend_api.NODATA_SCORE]
+        use_optimal = yield_goal == "Max Yield (Strict)"
+        df["status"] = [backend_api.status_label(s, use_optimal) for s in df["status"]]
+        return df.sort_values("score", ascending=False, kind="stable").reset_index(drop=True)
+
+
+_cube = None
+_stale_warned = None
+
+
+def get_cube():
+    """
+    Process-wide SuitabilityCube, or None if it hasn't been built or was built
+    for other plant data than the current plants table (rebuild it after an
+    upload). Without a DB connection the version can't be checked and the
+    cube is served as is.
+    """
+    global _cube, _stale_warned
+    table = backend_api.get_plant_table()
+    version = table["version"] if table else None
+    if _cube is not None and version and _cube.plants_version != version:
+        _cube = None  # the cube on disk may have been rebuilt since
+    if _cube is None:
+        if not os.path.exists(os.path.join(SUITABILITY_DIR, "meta.json")):
+            return None
+        cube = SuitabilityCube()
+        if version and cube.plants_version != version:
+            if _stale_warned != (cube.plants_version, version):
+                _stale_warned = (cube.plants_version, version)
+                print(
+                    f"⚠️ WARNING: Suitability cube is for plants version {cube.plants_version}, "
+                    f"the plants table is at {version}. Rebuild with suitability_cube.py."
+                )
+            return None
+        _cube = cube
+    return _cube
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute suitability for all plants.")
+    parser.add_argument("--resolution", type=float, default=0.5, help="grid size in degrees")
+    parser.add_argument("--output", default=SUITABILITY_DIR)
+    parser.add_argument("--strip-rows", type=int, default=20, help="grid rows scored at once")
+    args = parser.parse_args()
+
+    try:
+        build_cube(args.resolution, args.output, args.strip_rows)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
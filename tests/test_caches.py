@@ -0,0 +1,117 @@
+import pytest
+import backend_api
+
+# ==========================================
+# CLIMATE / ANALYSIS CACHES
+# ==========================================
+# The per-pixel memoization in load_climate / analyze_suitability, with the
+# backend replaced by counters so no database or raster is needed.
+#
+#   python -m pytest -q tests
+
+PIXEL = 1.0 / backend_api.CLIMATE_PIXELS_PER_DEG
+# Raw layer values (CHELSA scaling): ~15°C mean, 5..30°C, 800 mm
+RAW_ROW = (2881, 2781, 3031, 800, 20, 500)
+PLANT = {
+    "Min_Temp": 0, "Max_Temp": 35, "Min_Rain": 300, "Max_Rain": 2000,
+    "Opt_Min_Temp": 10, "Opt_Max_Temp": 28, "Opt_Min_Rain": 500, "Opt_Max_Rain": 1500,
+}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Counts backend reads; `version` is the plant data version served."""
+    state = {"raw_calls": [], "version": "v1"}
+
+    def fake_load_raw(lat, lon):
+        state["raw_calls"].append((lat, lon))
+        return RAW_ROW, None
+
+    monkeypatch.setattr(backend_api, "_load_raw", fake_load_raw)
+    monkeypatch.setattr(backend_api, "get_plant_table", lambda: {"version": state["version"]})
+    monkeypatch.setattr(backend_api, "get_plant_rules", lambda name: dict(PLANT))
+    monkeypatch.setattr(backend_api, "get_location_name", lambda lat, lon: "Testland")
+    backend_api.clear_caches()
+    yield state
+    backend_api.clear_caches()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = backend_api.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)  # "a" is now the most recent
+    cache.put("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["size"] == 2
+
+
+def test_lru_cache_keeps_none_and_can_be_disabled():
+    cache = backend_api.LRUCache(1)
+    cache.put("ocean", None)
+    assert cache.get("ocean") == (True, None)
+
+    disabled = backend_api.LRUCache(0)
+    disabled.put("a", 1)
+    assert disabled.get("a") == (False, None)
+
+
+def test_clicks_in_the_same_pixel_share_one_entry(backend):
+    lat, lon = 48.1, 11.5
+    row, col = backend_api.snap_to_pixel(lat, lon)
+    center_lat, center_lon = backend_api.pixel_center((row, col))
+
+    first, _ = backend_api.load_climate(center_lat + PIXEL * 0.4, center_lon - PIXEL * 0.4)
+    second, _ = backend_api.load_climate(center_lat - PIXEL * 0.4, center_lon + PIXEL * 0.4)
+    assert first == second
+    # One read, at the pixel centre, whichever point in the pixel was clicked
+    assert backend["raw_calls"] == [(center_lat, center_lon)]
+    assert backend_api.get_cache_stats()["climate"]["size"] == 1
+
+
+def test_neighbouring_pixels_do_not_share(backend):
+    center_lat, center_lon = backend_api.pixel_center(backend_api.snap_to_pixel(48.1, 11.5))
+    for lat, lon in [
+        (center_lat, center_lon),
+        (center_lat + PIXEL, center_lon),
+        (center_lat, center_lon + PIXEL),
+        (center_lat - PIXEL, center_lon - PIXEL),
+    ]:
+        backend_api.load_climate(lat, lon)
+    assert len(backend["raw_calls"]) == 4
+    assert backend_api.get_cache_stats()["climate"]["size"] == 4
+
+
+def test_plant_version_change_misses_the_analysis_cache(backend):
+    first = backend_api.analyze_suitability("Testplant", 48.1, 11.5)
+    assert backend_api.analyze_suitability("Testplant", 48.1, 11.5) == first
+    assert backend_api.get_cache_stats()["analysis"]["hits"] == 1
+
+    backend["version"] = "v2"
+    assert backend_api.analyze_suitability("Testplant", 48.1, 11.5) == first
+    stats = backend_api.get_cache_stats()["analysis"]
+    assert (stats["hits"], stats["size"]) == (1, 2)
+    # The climate pixel itself is still cached: an upload only touches plants
+    assert len(backend["raw_calls"]) == 1
+
+
+def test_changing_a_result_does_not_change_the_cache(backend):
+    result = backend_api.analyze_suitability("Testplant", 48.1, 11.5)
+    expected_score = result["score"]
+    result["score"] = -1
+    result["reasons"].append("edited by the caller")
+    result["climate"]["rain"] = 0
+    result["plant"]["Min_Temp"] = 99
+
+    again = backend_api.analyze_suitability("Testplant", 48.1, 11.5)
+    assert again["score"] == expected_score
+    assert "edited by the caller" not in again["reasons"]
+    assert again["climate"]["rain"] == 800
+    assert again["plant"]["Min_Temp"] == PLANT["Min_Temp"]
+
+    climate, _ = backend_api.load_climate(48.1, 11.5)
+    climate["rain"] = 0
+    assert backend_api.load_climate(48.1, 11.5)[0]["rain"] == 800
@@ -0,0 +1,41 @@
+import pandas as pd
+import clean_and_upload
+
+# ==========================================
+# CSV CLEANING
+# ==========================================
+# The chunked cleaner must give the same table as one whole-file pass, and
+# the encoding check must look past an ASCII-only top of the file.
+#
+#   python -m pytest -q tests
+
+
+def test_small_chunks_match_the_whole_file():
+    whole = clean_and_upload.clean_ecocrop(clean_and_upload.INPUT_CSV)
+    chunked = pd.concat(
+        clean_and_upload.iter_clean_ecocrop(clean_and_upload.INPUT_CSV, chunk_rows=97),
+        ignore_index=True,
+    )
+    assert whole.shape == (2063, 13)
+    assert list(whole.columns) == list(clean_and_upload.COL_MAP.values())
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_latin1_further_down_is_not_utf8(tmp_path):
+    path = tmp_path / "crops.csv"
+    rows = ["ScientificName,TMIN,TMAX,RMIN,RMAX"]
+    rows += [f"Plant {i},5,30,400,1500" for i in range(2000)]
+    rows.append("Brassica oleracea var. gemmifera (Chou de Bruxelles à jets),0,25,500,1200")
+    path.write_bytes("\n".join(rows).encode("latin1"))
+
+    # The accent sits after the first block, so a block-only check would say utf-8
+    assert clean_and_upload.detect_encoding(path, block_bytes=1024) == "latin1"
+    clean = clean_and_upload.clean_ecocrop(path)
+    assert len(clean) == 2001
+    assert clean["name"].iloc[-1].endswith("à jets)")
+
+
+def test_utf8_with_bom(tmp_path):
+    path = tmp_path / "crops.csv"
+    path.write_bytes("\ufeffScientificName,TMIN\nCafé,5\n".encode("utf-8"))
+    assert clean_and_upload.detect_encoding(path) == "utf-8-sig"
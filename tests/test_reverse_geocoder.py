@@ -0,0 +1,64 @@
+import pytest
+import reverse_geocoder
+from countries import WORLD_LOCATIONS
+
+# ==========================================
+# OFFLINE REVERSE GEOCODER
+# ==========================================
+# Known points against the bundled data/world-countries.json boundaries.
+#
+#   python -m pytest -q tests
+
+# Centroids that are too close to a generalized border to resolve to their
+# own country (see the "Known limit" note in reverse_geocoder.py)
+KNOWN_LIMITS = {"Gambia": "Senegal"}
+
+
+@pytest.mark.parametrize(
+    "lat, lon, expected",
+    [
+        (52.52, 13.40, "Germany"),  # Berlin
+        (47.92, 106.92, "Mongolia"),  # Ulaanbaatar
+        (-15.79, -47.88, "Brazil"),  # Brasília
+        (13.45, -15.40, "Gambia"),  # well inside the Gambia polygon
+    ],
+)
+def test_inland_cities(lat, lon, expected):
+    assert reverse_geocoder.country_at(lat, lon) == expected
+
+
+@pytest.mark.parametrize("lat, lon", [(0.0, -30.0), (-40.0, 90.0), (30.0, -150.0)])
+def test_open_ocean_is_no_country(lat, lon):
+    assert reverse_geocoder.country_at(lat, lon) is None
+
+
+def test_enclave_is_not_its_surrounding_country():
+    # Lesotho is a hole in the South Africa polygon
+    assert reverse_geocoder.country_at(-29.6, 28.2) == "Lesotho"
+    assert reverse_geocoder.country_at(-29.6, 25.0) == "South Africa"
+
+
+def test_just_off_the_coast_resolves_to_the_country():
+    # West of Lisbon, outside the generalized coastline but within tolerance
+    assert reverse_geocoder.country_at(38.72, -9.6) == "Portugal"
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        pytest.param(
+            name,
+            marks=pytest.mark.xfail(
+                name in KNOWN_LIMITS, reason="generalized border", strict=True
+            ),
+        )
+        for name in sorted(WORLD_LOCATIONS)
+    ],
+)
+def test_every_scan_centroid_resolves_to_its_country(name):
+    assert reverse_geocoder.country_at(*WORLD_LOCATIONS[name]) == name
+
+
+@pytest.mark.parametrize("name, resolved", sorted(KNOWN_LIMITS.items()))
+def test_known_limits_resolve_to_the_neighbour(name, resolved):
+    assert reverse_geocoder.country_at(*WORLD_LOCATIONS[name]) == resolved
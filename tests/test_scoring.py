@@ -0,0 +1,177 @@
+import itertools
+import numpy as np
+import pytest
+import backend_api
+
+# ==========================================
+# SCORING EQUIVALENCE
+# ==========================================
+# score_arrays / score_matrix must give exactly the results of the original
+# scalar rules (reference_single_score below is the pre-vectorization code,
+# plus the "None is not scored" rule) on every point x plant pair.
+#
+#   python -m pytest -q tests
+
+GOALS = ["Survival", "Max Yield (Strict)"]
+WATER = ["Rainfed Only", "Irrigated"]
+
+PLANT = {
+    "Min_Temp": 5, "Max_Temp": 30, "Min_Rain": 400, "Max_Rain": 1500,
+    "Opt_Min_Temp": 12, "Opt_Max_Temp": 25, "Opt_Min_Rain": 600, "Opt_Max_Rain": 1200,
+}
+
+
+def reference_single_score(plant, climate, ignore_drought=False, use_optimal=False):
+    prefix = "Opt_" if use_optimal else ""
+    t_min, t_max, r_min, r_max = (
+        plant[prefix + f] for f in ("Min_Temp", "Max_Temp", "Min_Rain", "Max_Rain")
+    )
+    score, status = 100, "Ideal"
+    if climate["min_temp"] is not None and climate["min_temp"] < t_min:
+        return 0, "Dead" if not use_optimal else "Low Yield"
+    if climate["max_temp"] is not None and climate["max_temp"] > t_max:
+        score -= 20
+        status = "Stress"
+    if climate["rain"] is not None and climate["rain"] < r_min and not ignore_drought:
+        score -= 40
+        status = "Risk"
+    if climate["rain"] is not None and climate["rain"] > r_max:
+        score -= 10
+    return max(0, int(score)), status
+
+
+def reference_score(plant, climate, water_source, yield_goal):
+    use_optimal = yield_goal == "Max Yield (Strict)"
+    score_nat, status_nat = reference_single_score(plant, climate, False, use_optimal)
+    if water_source != "Irrigated":
+        return score_nat, status_nat, 0
+    score_irr, status_irr = reference_single_score(plant, climate, True, use_optimal)
+    return score_irr, status_irr, max(0, score_irr - score_nat)
+
+
+def _boundary_climates(plant):
+    """Every threshold exactly, just inside/outside it, and None."""
+    temps = {None}
+    rains = {None}
+    for f in ("Min_Temp", "Max_Temp", "Opt_Min_Temp", "Opt_Max_Temp"):
+        temps.update((plant[f] - 0.1, plant[f], plant[f] + 0.1))
+    for f in ("Min_Rain", "Max_Rain", "Opt_Min_Rain", "Opt_Max_Rain"):
+        rains.update((plant[f] - 1, plant[f], plant[f] + 1))
+    return [
+        {"min_temp": lo, "max_temp": hi, "rain": rain}
+        for lo, hi, rain in itertools.product(temps, temps, rains)
+    ]
+
+
+def _random_cases(n_points=300, n_plants=40, seed=7):
+    rng = np.random.default_rng(seed)
+    plants = []
+    for _ in range(n_plants):
+        t_min = float(rng.integers(-15, 20))
+        t_max = t_min + float(rng.integers(5, 30))
+        r_min = float(rng.integers(0, 1000))
+        r_max = r_min + float(rng.integers(100, 3000))
+        plants.append(
+            {
+                "Min_Temp": t_min, "Max_Temp": t_max, "Min_Rain": r_min, "Max_Rain": r_max,
+                "Opt_Min_Temp": t_min + 3, "Opt_Max_Temp": t_max - 3,
+                "Opt_Min_Rain": r_min + 100, "Opt_Max_Rain": r_max - 100,
+            }
+        )
+    climates = []
+    for i in range(n_points):
+        climate = {
+            "min_temp": float(rng.integers(-30, 25)),
+            "max_temp": float(rng.integers(5, 45)),
+            "rain": float(rng.integers(0, 4000)),
+        }
+        # Missing layers, and values sitting exactly on a plant's threshold
+        if i % 11 == 0:
+            climate[("min_temp", "max_temp", "rain")[i % 3]] = None
+        if i % 7 == 0:
+            plant = plants[i % n_plants]
+            climate["min_temp"], climate["rain"] = plant["Min_Temp"], plant["Max_Rain"]
+        climates.append(climate)
+    return climates, plants
+
+
+CASES = {
+    "boundary": (_boundary_climates(PLANT), [PLANT]),
+    "random": _random_cases(),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("water_source", WATER)
+@pytest.mark.parametrize("yield_goal", GOALS)
+def test_score_matrix_matches_scalar_rules(case, water_source, yield_goal):
+    climates, plants = CASES[case]
+    climate_cols = backend_api._columns(climates, ["min_temp", "max_temp", "rain"])
+    score, status, bonus = backend_api.score_matrix(
+        climate_cols, backend_api.plant_columns(plants), water_source, yield_goal
+    )
+    use_optimal = yield_goal == "Max Yield (Strict)"
+
+    for p, climate in enumerate(climates):
+        for k, plant in enumerate(plants):
+            expected = reference_score(plant, climate, water_source, yield_goal)
+            got = (
+                int(score[p, k]),
+                backend_api.status_label(status[p, k], use_optimal),
+                int(bonus[p, k]),
+            )
+            assert got == expected, (climate, plant)
+
+
+@pytest.mark.parametrize("ignore_drought", [False, True])
+@pytest.mark.parametrize("use_optimal", [False, True])
+def test_score_arrays_matches_scalar_rules(ignore_drought, use_optimal):
+    climates, plants = CASES["random"]
+    score, status = backend_api.score_arrays(
+        backend_api._columns(climates, ["min_temp", "max_temp", "rain"]),
+        backend_api.plant_columns(plants),
+        ignore_drought,
+        use_optimal,
+    )
+    for p, climate in enumerate(climates):
+        for k, plant in enumerate(plants):
+            expected = reference_single_score(plant, climate, ignore_drought, use_optimal)
+            got = int(score[p, k]), backend_api.status_label(status[p, k], use_optimal)
+            assert got == expected, (climate, plant)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("water_source", WATER)
+@pytest.mark.parametrize("yield_goal", GOALS)
+def test_calculate_score_logic_matches_score_matrix(case, water_source, yield_goal):
+    climates, plants = CASES[case]
+    score, status, bonus = backend_api.score_matrix(
+        backend_api._columns(climates, ["min_temp", "max_temp", "rain"]),
+        backend_api.plant_columns(plants),
+        water_source,
+        yield_goal,
+    )
+    use_optimal = yield_goal == "Max Yield (Strict)"
+
+    for p, climate in enumerate(climates):
+        for k, plant in enumerate(plants):
+            got = backend_api.calculate_score_logic(plant, climate, water_source, yield_goal)
+            expected = (
+                int(score[p, k]),
+                backend_api.status_label(status[p, k], use_optimal),
+                int(bonus[p, k]),
+            )
+            assert (got[0], got[1], got[3]) == expected, (climate, plant)
+
+
+def test_calculate_score_logic_reasons():
+    climate = {"min_temp": 6, "max_temp": 33, "rain": 300}
+    score, status, reasons, bonus = backend_api.calculate_score_logic(PLANT, climate, "Irrigated")
+    assert (score, status, bonus) == (80, "Stress", 40)
+    assert reasons == ["🔥 Too Hot: 33°C > 30°C", "💧 Irrigation Bonus: +40"]
+
+    cold = {"min_temp": 4, "max_temp": 33, "rain": 300}
+    assert backend_api.calculate_score_logic(PLANT, cold) == (
+        0, "Dead", ["❄️ Too Cold: 4°C < 5°C"], 0
+    )
+    assert backend_api.calculate_score_logic(PLANT, None) == (0, "Error", [], 0)
@@ -0,0 +1,269 @@
+import os
+import math
+import zlib
+import struct
+import hashlib
+import asyncio
+import argparse
+import threading
+import numpy as np
+from aiohttp import web
+import backend_api
+import geotiff_climate
+
+# ==========================================
+# SUITABILITY TILE SERVER
+# ==========================================
+# Serves XYZ map tiles coloured by suitability, so the global map can show
+# regions inside a country instead of one colour per country:
+#
+#   GET /tiles/{plant}/{z}/{x}/{y}.png?water=Irrigated&goal=Survival
+#
+# Each tile reads the climate window under it from chelsa_raw/ (GeoTIFF
+# backend), scores it with backend_api.score_grid and colours it with the
+# same thresholds as the map legend. Rendered tiles are kept in an on-disk
+# cache that drops the least recently used files once it outgrows
+# TILE_CACHE_MAX_MB, so panning is a file read after warm-up.
+#
+#   python tile_server.py --port 8080
+#
+# In the app, set TILE_SERVER_URL (as seen from the browser) to add the layer.
+
+TILE_SIZE = 256
+MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "12"))
+TILE_CACHE_DIR = os.getenv(
+    "TILE_CACHE_DIR", os.path.join(backend_api.BASE_DIR, "tile_cache")
+)
+TILE_CACHE_MAX_MB = int(os.getenv("TILE_CACHE_MAX_MB", "512"))
+WATER_SOURCES = ["Rainfed Only", "Irrigated"]
+YIELD_GOALS = ["Survival", "Max Yield (Strict)"]
+
+# Same colours and cut-offs as the global map legend (>=75 / >=45 / below)
+PALETTE = np.zeros((256, 4), dtype=np.uint8)
+PALETTE[0:45] = (0xE6, 0xA8, 0xD7, 255)  # C_PINK
+PALETTE[45:75] = (0x1F, 0x89, 0xD8, 255)  # C_MED_BLUE
+PALETTE[75:101] = (0xBD, 0xD4, 0x09, 255)  # C_LIME
+# NODATA_SCORE (ocean / no data) stays fully transparent
+
+
+# ==========================================
+# 1. TILE RENDERING
+# ==========================================
+def _tile_lat(y, n):
+    """Latitude of the top edge of tile row y (fractional) at 2^z tiles."""
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+def tile_bounds(z, x, y):
+    """(west, south, east, north) of a Web Mercator tile in degrees."""
+    n = 2**z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    return west, _tile_lat(y + 1, n), east, _tile_lat(y, n)
+
+
+def encode_png(rgba):
+    """Minimal RGBA PNG encoder (no Pillow needed)."""
+    height, width, _ = rgba.shape
+    # Each scanline starts with filter type 0 (None)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_tile(plant, z, x, y, water_source="Rainfed Only", yield_goal="Survival"):
+    """Scores and colours one 256x256 tile, returned as PNG bytes."""
+    west, south, east, north = tile_bounds(z, x, y)
+    raw = geotiff_climate.get_reader().read_window(
+        (west, south, east, north), out_shape=(TILE_SIZE, TILE_SIZE)
+    )
+
+    # The window rows are evenly spaced in latitude, tile rows in Mercator y:
+    # pick the window row under the centre of each tile row.
+    n = 2**z
+    centers = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + centers) / n))))
+    rows = ((north - lats) / (north - south) * TILE_SIZE).astype(int)
+    raw = raw[:, np.clip(rows, 0, TILE_SIZE - 1), :]
+
+    score, _ = backend_api.score_grid(
+        raw, backend_api.plant_columns([plant]), water_source, yield_goal
+    )
+    return encode_png(PALETTE[score[0]])
+
+
+# ==========================================
+# 2. DISK CACHE
+# ==========================================
+class TileCache:
+    """PNG files on disk, least recently used dropped above max_bytes."""
+
+    def __init__(self, directory=TILE_CACHE_DIR, max_bytes=TILE_CACHE_MAX_MB * 1024**2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.size = sum(size for _, _, size in self._files())
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def path(self, *key):
+        return os.path.join(self.directory, *[str(k) for k in key]) + ".png"
+
+    def get(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # mtime doubles as "last used" for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None  # evicted by another request in the meantime
+        return data
+
+    def put(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Trim to 90% so we don't walk the tree again on the very next write
+        target = self.max_bytes * 0.9
+        files = sorted(self._files(), key=lambda f: f[1])
+        self.size = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                self.size -= size
+            except OSError:
+                pass
+
+
+# ==========================================
+# 3. HTTP
+# ==========================================
+def _safe_name(text):
+    """Filesystem-safe and still unique: "Zea mays" and "Zea-mays" differ by the hash."""
+    safe = "".join(c if c.isalnum() else "_" for c in text)
+    return f"{safe}-{hashlib.md5(text.encode('utf-8')).hexdigest()[:8]}"
+
+
+async def _render_and_cache(cache, pending, path, plant, z, x, y, water, goal):
+    """Renders one tile and stores it, whoever is still waiting for it."""
+    loop = asyncio.get_running_loop()
+    try:
+        data = await loop.run_in_executor(None, render_tile, plant, z, x, y, water, goal)
+        await loop.run_in_executor(None, cache.put, path, data)
+        return data
+    finally:
+        del pending[path]
+
+
+async def tile_handler(request):
+    plant_name = request.match_info["plant"]
+    z, x, y = (int(request.match_info[k]) for k in ("z", "x", "y"))
+    water = request.query.get("water", "Rainfed Only")
+    goal = request.query.get("goal", "Survival")
+
+    n = 2**z
+    if z > MAX_ZOOM or x >= n or y >= n:
+        raise web.HTTPNotFound(text="Tile out of range")
+    if water not in WATER_SOURCES or goal not in YIELD_GOALS:
+        raise web.HTTPBadRequest(text="Unknown water source or yield goal")
+
+    loop = asyncio.get_running_loop()
+    plant = await loop.run_in_executor(None, backend_api.get_plant_rules, plant_name)
+    if not plant:
+        raise web.HTTPNotFound(text=f"Unknown plant: {plant_name}")
+
+    # The plant version is part of the path, so re-uploaded rules get new tiles
+    table = await loop.run_in_executor(None, backend_api.get_plant_table)
+    if table is None:
+        raise web.HTTPServiceUnavailable(text="DB Error")
+    cache = request.app["tile_cache"]
+    path = cache.path(
+        _safe_name(str(table["version"])), _safe_name(plant_name), _safe_name(water),
+        _safe_name(goal), z, x, y,
+    )
+
+    data = await loop.run_in_executor(None, cache.get, path)
+    if data is None:
+        # Several map clients asking for the same cold tile share one render.
+        # The render is its own task and every client awaits it shielded, so
+        # a client that disconnects can't cancel it for the others.
+        pending = request.app["tile_renders"]
+        render = pending.get(path)
+        if render is None:
+            render = asyncio.ensure_future(
+                _render_and_cache(cache, pending, path, plant, z, x, y, water, goal)
+            )
+            pending[path] = render
+        data = await asyncio.shield(render)
+
+    return web.Response(
+        body=data,
+        content_type="image/png",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+def add_tile_routes(app, cache=None):
+    """Mounts /tiles/... on an aiohttp application."""
+    app["tile_cache"] = cache or TileCache()
+    app["tile_renders"] = {}
+    app.router.add_get(r"/tiles/{plant}/{z:\d+}/{x:\d+}/{y:\d+}.png", tile_handler)
+    return app
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    # The map page is served by Streamlit, i.e. from another origin
+    response = await handler(request)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def make_app():
+    app = web.Application(middlewares=[cors_middleware])
+    return add_tile_routes(app)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve suitability map tiles.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    try:
+        print(f"Tile cache: {TILE_CACHE_DIR} (max {TILE_CACHE_MAX_MB} MB)")
+        web.run_app(make_app(), host=args.host, port=args.port)
+    except Exception as e:
+        print(f"❌ ERROR: {e}")